@@ -504,7 +504,7 @@ class addModifierDialog(QDialog, Ui_Dialog):
                 }
 
             if len(self.leCode.text().strip()) > 1:
-                if self.leCode.text().strip().upper() not in cfg.function_keys.values():
+                if self.leCode.text().strip().upper() not in cfg.FUNCTION_KEYS_NAMES:
                     QMessageBox.critical(
                         self,
                         cfg.programName,
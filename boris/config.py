@@ -69,6 +69,8 @@ function_keys = {
     16777274: "F11",
     16777275: "F12",
 }
+# names of the function keys for membership tests
+FUNCTION_KEYS_NAMES: frozenset = frozenset(function_keys.values())
 
 PROJECT_NAME = "project_name"
 PROJECT_DATE = "project_date"
@@ -275,6 +277,9 @@ BEHAVIOR_TYPES = [
     "State event with coding map",
 ]
 
+# position of each behavior type in BEHAVIOR_TYPES
+BEHAVIOR_TYPES_IDX: dict = {behavior_type: idx for idx, behavior_type in enumerate(BEHAVIOR_TYPES)}
+
 DEFAULT_BEHAVIOR_TYPE = "Point event"
 
 MEDIA_TW_EVENTS_FIELDS_DEFAULT = ("time", FRAME_INDEX, "subject", "code", "type", "modifier", "comment")
@@ -328,6 +333,12 @@ for observation_type in PJ_EVENTS_FIELDS:
 # fields for independent variable definition
 tw_indVarFields = ["label", "description", "type", "default value", "possible values"]
 
+# column indexes of the independent variables table
+INDEP_VAR_LABEL_IDX = tw_indVarFields.index("label")
+INDEP_VAR_TYPE_IDX = tw_indVarFields.index("type")
+INDEP_VAR_DEFAULT_VALUE_IDX = tw_indVarFields.index("default value")
+INDEP_VAR_POSSIBLE_VALUES_IDX = tw_indVarFields.index("possible values")
+
 
 EVENT_TIME_FIELD_IDX = 0
 EVENT_SUBJECT_FIELD_IDX = 1
@@ -406,6 +417,8 @@ TIME_EVENTS = "limit to events"
 TIME_ARBITRARY_INTERVAL = "time interval"
 
 AVAILABLE_INDEP_VAR_TYPES = [NUMERIC, TEXT, SET_OF_VALUES, TIMESTAMP]
+# position of each type in AVAILABLE_INDEP_VAR_TYPES
+AVAILABLE_INDEP_VAR_TYPES_IDX: dict = {var_type: idx for idx, var_type in enumerate(AVAILABLE_INDEP_VAR_TYPES)}
 
 INDEPENDENT_VARIABLES = "independent_variables"
 OBSERVATIONS = "observations"
@@ -810,6 +810,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         else:
             categories = ["###no category###"]
 
+        behavior_event_type = project_functions.event_type_by_code(self.pj[cfg.ETHOGRAM])
         for category in categories:
             if category != "###no category###":
                 if category == "":
@@ -829,7 +830,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
             # check if behavior type must be shown
             for behavior in [self.pj[cfg.ETHOGRAM][x][cfg.BEHAVIOR_CODE] for x in util.sorted_keys(self.pj[cfg.ETHOGRAM])]:
-                if project_functions.event_type(behavior, self.pj[cfg.ETHOGRAM]) not in behavior_type:
+                if behavior_event_type.get(behavior) not in behavior_type:
                     continue
 
                 if (categories == ["###no category###"]) or (
@@ -1065,8 +1066,11 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
                 self.pj[cfg.OBSERVATIONS][self.observationId][cfg.VISUALIZE_SPECTROGRAM] = True
                 self.spectro.sendEvent.connect(self.signal_from_widget)
-                self.spectro.sb_freq_min.setValue(0)
-                self.spectro.sb_freq_max.setValue(int(self.spectro.frame_rate / 2))
+                # set the frequency interval without plotting (the spectrogram is plotted once by plot_timer_out)
+                for spin_box, value in ((self.spectro.sb_freq_min, 0), (self.spectro.sb_freq_max, int(self.spectro.frame_rate / 2))):
+                    spin_box.blockSignals(True)
+                    spin_box.setValue(value)
+                    spin_box.blockSignals(False)
                 self.spectro.show()
 
                 self.plot_timer_out()
@@ -127,6 +127,7 @@ def events_snapshots(self):
         time_interval=cfg.TIME_FULL_OBS,
     )
 
+    behavior_event_type = project_functions.event_type_by_code(self.pj[cfg.ETHOGRAM])
     for obs_id in selected_observations:
         for nplayer in self.pj[cfg.OBSERVATIONS][obs_id][cfg.FILE]:
             if not self.pj[cfg.OBSERVATIONS][obs_id][cfg.FILE][nplayer]:
@@ -143,7 +144,7 @@ def events_snapshots(self):
                     )
                     rows = [{"occurence": util.float2decimal(r["occurence"])} for r in cursor.fetchall()]
 
-                    behavior_state = project_functions.event_type(behavior, self.pj[cfg.ETHOGRAM])
+                    behavior_state = behavior_event_type.get(behavior)
 
                     for idx, row in enumerate(rows):
                         mediaFileIdx = [idx1 for idx1, x in enumerate(duration1) if row["occurence"] >= sum(duration1[0:idx1])][-1]
@@ -396,6 +397,7 @@ def extract_events(self):
 
     ffmpeg_extract_command: str = '"{ffmpeg_bin}" -ss {start} -i "{input_}" -y -t {duration} {codecs} '
     mem_command: str = ""
+    behavior_event_type = project_functions.event_type_by_code(self.pj[cfg.ETHOGRAM])
     for obs_id in selected_observations:
         for nplayer in self.pj[cfg.OBSERVATIONS][obs_id][cfg.FILE]:
             if not self.pj[cfg.OBSERVATIONS][obs_id][cfg.FILE][nplayer]:
@@ -413,7 +415,7 @@ def extract_events(self):
                     )
                     rows = [{"occurence": util.float2decimal(r["occurence"])} for r in cursor.fetchall()]
 
-                    behavior_state = project_functions.event_type(behavior, self.pj[cfg.ETHOGRAM])
+                    behavior_state = behavior_event_type.get(behavior)
                     if cfg.STATE in behavior_state and len(rows) % 2:  # unpaired events
                         continue
 
@@ -33,6 +33,9 @@ from PyQt5.QtWidgets import (
     QSizePolicy,
 )
 
+# style of the checkboxes of the exclusion matrix
+CHECKBOX_STYLE_SHEET = "text-align: center; margin-left:50%; margin-right:50%;"
+
 
 class ExclusionMatrix(QDialog):
     def __init__(self):
@@ -135,7 +138,7 @@ class ExclusionMatrix(QDialog):
             for c, c_name in enumerate(self.stateBehaviors):
                 if c_name != r_name:
                     try:
-                        if f"{c_name}|{r_name}" in self.checkboxes:
-                            self.checkboxes[f"{c_name}|{r_name}"].setChecked(self.checkboxes[f"{r_name}|{c_name}"].isChecked())
+                        if (c_name, r_name) in self.checkboxes:
+                            self.checkboxes[(c_name, r_name)].setChecked(self.checkboxes[(r_name, c_name)].isChecked())
                     except Exception:
                         logging.warning(f"Error during checking/unchecking for {r_name}/{c_name} in exclusion matrix")
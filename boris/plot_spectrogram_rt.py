@@ -23,9 +23,6 @@ Copyright 2012-2024 Olivier Friard
 
 import wave
 import matplotlib
-
-matplotlib.use("Qt5Agg")
-
 import numpy as np
 
 from . import config as cfg
@@ -42,7 +39,6 @@ from PyQt5.QtCore import pyqtSignal, QEvent
 from PyQt5 import Qt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-import matplotlib.ticker as mticker
 
 # matplotlib.pyplot.switch_backend("Qt5Agg")
 
@@ -62,8 +58,16 @@ class Plot_spectrogram_RT(QWidget):
 
         self.spectro_color_map = matplotlib.pyplot.get_cmap("viridis")
 
+        # spectrogram parameters (window computed once)
+        self.NFFT, self.hop = 256, 128
+        self.window = np.hanning(self.NFFT).astype(np.float32)
+        self.window_norm = np.square(self.window).sum()
+
         self.figure = Figure()
         self.ax = self.figure.add_subplot(1, 1, 1)
+        # spectrogram image and cursor are created at first plot and then updated
+        self.image = None
+        self.cursor = None
 
         self.canvas = FigureCanvas(self.figure)
 
@@ -132,7 +136,7 @@ class Plot_spectrogram_RT(QWidget):
         try:
             wav = wave.open(wav_file, "r")
             frames = wav.readframes(-1)
-            sound_info = np.fromstring(frames, dtype=np.int16)
+            sound_info = np.frombuffer(frames, dtype=np.int16)
             frame_rate = wav.getframerate()
             wav.close()
             return sound_info, frame_rate
@@ -185,6 +189,49 @@ class Plot_spectrogram_RT(QWidget):
 
         return {"media_length": self.media_length, "frame_rate": self.frame_rate}
 
+    def spectrogram(self, signal: np.ndarray, t0: float) -> tuple:
+        """
+        compute the spectrogram (dB) of signal, reduced along the time axis to the canvas width
+
+        Args:
+            signal (np.ndarray): samples
+            t0 (float): time of the first sample (in seconds)
+
+        Returns:
+            np.ndarray: spectrogram values (dB), highest frequency on first row
+            tuple: extent of spectrogram image (xmin, xmax, ymin, ymax)
+        """
+
+        NFFT, hop = self.NFFT, self.hop
+
+        if len(signal) < NFFT:
+            signal = np.pad(signal, (0, NFFT - len(signal)))
+
+        # all the FFT of the hanning-windowed segments in one batch (one-sided PSD, as mlab.specgram)
+        segments = np.lib.stride_tricks.sliding_window_view(signal, NFFT)[::hop] * self.window
+        spec = np.square(np.abs(np.fft.rfft(segments, axis=1))).T
+        spec /= self.frame_rate * self.window_norm
+        spec[1:-1] *= 2
+
+        # keep at most one column per screen pixel: columns narrower than a pixel are merged (max)
+        n_columns = spec.shape[1]
+        factor = n_columns // max(int(self.ax.bbox.width), 1)
+        if factor >= 2:
+            n_columns = (n_columns // factor) * factor
+            spec = spec[:, :n_columns].reshape(spec.shape[0], -1, factor).max(axis=2)
+
+        xmin = t0 + (NFFT - hop) / 2 / self.frame_rate
+        extent = (xmin, xmin + n_columns * hop / self.frame_rate, 0, self.frame_rate / 2)
+
+        # only the silent bins (0) are raised, to the lowest non-zero power, to avoid -inf values in the image
+        silent = spec == 0
+        if silent.any():
+            spec[silent] = np.finfo(spec.dtype).tiny if silent.all() else spec[~silent].min()
+        np.log10(spec, out=spec)
+        spec *= 10.0
+
+        return np.flipud(spec), extent
+
     def plot_spectro(self, current_time: float, force_plot: bool = False):
         """
         plot sound spectrogram centered on the current time
@@ -199,67 +246,25 @@ class Plot_spectrogram_RT(QWidget):
 
         self.time_mem = current_time
 
-        self.ax.clear()
-
-        # start
-        if current_time <= self.interval / 2:
-            self.ax.specgram(
-                self.sound_info[: int((self.interval) * self.frame_rate)],
-                mode="psd",
-                # NFFT=1024,
-                Fs=self.frame_rate,
-                # noverlap=900,
-                cmap=self.spectro_color_map,
-            )
+        # interval of samples centered on current time (shifted at the start and at the end of media)
+        n_samples = int(self.interval * self.frame_rate)
+        i = max(0, min(int(round((current_time - self.interval / 2) * self.frame_rate, 0)), len(self.sound_info) - n_samples))
 
-            self.ax.set_xlim(current_time - self.interval / 2, current_time + self.interval / 2)
+        Z, extent = self.spectrogram(self.sound_info[i : i + n_samples], i / self.frame_rate)
 
-            # cursor
-            self.ax.axvline(x=current_time, color=self.cursor_color, linestyle="-")
-
-        elif current_time >= self.media_length - self.interval / 2:
-            i = int(round(len(self.sound_info) - (self.interval * self.frame_rate), 0))
-
-            self.ax.specgram(
-                self.sound_info[i:],
-                mode="psd",
-                # NFFT=1024,
-                Fs=self.frame_rate,
-                # noverlap=900,
-                cmap=self.spectro_color_map,
+        if self.image is None:
+            self.image = self.ax.imshow(
+                Z, cmap=self.spectro_color_map, extent=extent, origin="upper", aspect="auto", interpolation="nearest"
             )
-
-            lim1 = current_time - (self.media_length - self.interval / 2)
-            lim2 = lim1 + self.interval
-
-            self.ax.set_xlim(lim1, lim2)
-
-            self.ax.xaxis.set_major_locator(mticker.FixedLocator(self.ax.get_xticks().tolist()))
-            self.ax.set_xticklabels([str(round(w + self.media_length - self.interval, 1)) for w in self.ax.get_xticks()])
-
             # cursor
-            self.ax.axvline(x=lim1 + self.interval / 2, color=self.cursor_color, linestyle="-")
-
-        # middle
+            self.cursor = self.ax.axvline(x=current_time, color=self.cursor_color, linestyle="-")
         else:
-            self.ax.specgram(
-                self.sound_info[
-                    int(round((current_time - self.interval / 2) * self.frame_rate, 0)) : int(
-                        round((current_time + self.interval / 2) * self.frame_rate, 0)
-                    )
-                ],
-                mode="psd",
-                # NFFT=1024,
-                Fs=self.frame_rate,
-                # noverlap=900,
-                cmap=self.spectro_color_map,
-            )
-
-            self.ax.xaxis.set_major_locator(mticker.FixedLocator(self.ax.get_xticks().tolist()))
-            self.ax.set_xticklabels([str(round(current_time + w - self.interval / 2, 1)) for w in self.ax.get_xticks()])
+            self.image.set_data(Z)
+            self.image.set_extent(extent)
+            self.image.autoscale()
+            self.cursor.set_xdata([current_time, current_time])
 
-            # cursor
-            self.ax.axvline(x=self.interval / 2, color=self.cursor_color, linestyle="-")
+        self.ax.set_xlim(current_time - self.interval / 2, current_time + self.interval / 2)
 
         self.ax.set_ylim(self.sb_freq_min.value(), self.sb_freq_max.value())
         """self.figure.subplots_adjust(wspace=0, hspace=0)"""
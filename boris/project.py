@@ -20,8 +20,11 @@ This file is part of BORIS.
 
 """
 
+import ast
+import copy
 import json
 import logging
+import pathlib as pl
 import re
 
 from PyQt5.QtCore import Qt, QDateTime
@@ -53,6 +56,12 @@ from . import utilities as util
 from . import converters, dialog, exclusion_matrix, project_import_export
 from .project_ui import Ui_dlgProject
 
+# modifier shortcut between parenthesis, e.g. "modifier (k)"
+MODIFIER_KEY_RE = re.compile(r"\((\w+)\)")
+
+# spaces around the commas of a set of values, e.g. "a , b"
+COMMA_SPACES_RE = re.compile(r"\s*,\s*")
+
 
 class BehavioralCategories(QDialog):
     """
@@ -68,6 +77,13 @@ class BehavioralCategories(QDialog):
         self.renamed = None
         self.removed = None
 
+        # behavior codes by behavioral category
+        self.behaviors_by_category: dict = {}
+        for behavior in pj[cfg.ETHOGRAM].values():
+            category = behavior.get(cfg.BEHAVIOR_CATEGORY)
+            if category is not None:
+                self.behaviors_by_category.setdefault(category, []).append(behavior[cfg.BEHAVIOR_CODE])
+
         self.vbox = QVBoxLayout(self)
 
         self.label = QLabel()
@@ -87,38 +103,24 @@ class BehavioralCategories(QDialog):
         # self.lw.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.lw.setSelectionMode(QAbstractItemView.SingleSelection)
 
+        # the row count is set once and the items are filled in place
         if cfg.BEHAVIORAL_CATEGORIES_CONF in pj:
-            self.lw.setRowCount(len(pj.get(cfg.BEHAVIORAL_CATEGORIES_CONF, {})))
-            behav_cat = pj.get(cfg.BEHAVIORAL_CATEGORIES_CONF, {})
-            for idx, key in enumerate(behav_cat.keys()):
+            behav_cat = pj[cfg.BEHAVIORAL_CATEGORIES_CONF]
+            self.lw.setRowCount(len(behav_cat))
+            for idx, category in enumerate(behav_cat.values()):
                 # name
-                item = QTableWidgetItem()
-                item.setText(behav_cat[key]["name"])
-                # item.setFlags(Qt.ItemIsEnabled)
-                self.lw.setItem(idx, 0, item)
+                self.lw.setItem(idx, 0, QTableWidgetItem(category["name"]))
                 # color
-                item = QTableWidgetItem()
-                item.setText(behav_cat[key].get(cfg.COLOR, ""))
-                if behav_cat[key].get(cfg.COLOR, ""):
-                    item.setBackground(QColor(behav_cat[key].get(cfg.COLOR, "")))
-                else:
-                    item.setBackground(QColor(230, 230, 230))
-                # item.setFlags(Qt.ItemIsEnabled)
+                color = category.get(cfg.COLOR, "")
+                item = QTableWidgetItem(color)
+                item.setBackground(QColor(color) if color else QColor(230, 230, 230))
                 self.lw.setItem(idx, 1, item)
         else:
-            self.lw.setRowCount(len(pj.get(cfg.BEHAVIORAL_CATEGORIES, [])))
-            for idx, category in enumerate(sorted(pj.get(cfg.BEHAVIORAL_CATEGORIES, []))):
-                item = QTableWidgetItem()
-                item.setText(category)
-                # item.setFlags(Qt.ItemIsEnabled)
-                self.lw.setItem(idx, 0, item)
-
-                item = QTableWidgetItem()
-                item.setText("")
-                # item.setFlags(Qt.ItemIsEnabled)
-                self.lw.setItem(idx, 1, item)
-
-            # self.lw.addItem(QListWidgetItem(category))
+            categories = sorted(pj.get(cfg.BEHAVIORAL_CATEGORIES, []))
+            self.lw.setRowCount(len(categories))
+            for idx, category in enumerate(categories):
+                self.lw.setItem(idx, 0, QTableWidgetItem(category))
+                self.lw.setItem(idx, 1, QTableWidgetItem(""))
 
         self.vbox.addWidget(self.lw)
 
@@ -202,13 +204,7 @@ class BehavioralCategories(QDialog):
                 continue
 
             category_to_remove = self.lw.item(self.lw.row(selected_item), 0).text().strip()
-            behaviors_in_category: list = []
-            for idx in self.pj[cfg.ETHOGRAM]:
-                if (
-                    cfg.BEHAVIOR_CATEGORY in self.pj[cfg.ETHOGRAM][idx]
-                    and self.pj[cfg.ETHOGRAM][idx][cfg.BEHAVIOR_CATEGORY] == category_to_remove
-                ):
-                    behaviors_in_category.append(self.pj[cfg.ETHOGRAM][idx][cfg.BEHAVIOR_CODE])
+            behaviors_in_category: list = self.behaviors_by_category.get(category_to_remove, [])
             flag_remove = False
             if behaviors_in_category:
                 flag_remove = (
@@ -230,6 +226,7 @@ class BehavioralCategories(QDialog):
             if flag_remove:
                 self.lw.removeRow(self.lw.row(selected_item))
                 self.removed = category_to_remove
+                self.behaviors_by_category.pop(category_to_remove, None)
 
                 self.accept()
 
@@ -240,13 +237,7 @@ class BehavioralCategories(QDialog):
         for selected_item in self.lw.selectedItems():
             # check if behavioral category is in use
             category_to_rename = self.lw.item(self.lw.row(selected_item), 0).text().strip()
-            behaviors_in_category = []
-            for idx in self.pj[cfg.ETHOGRAM]:
-                if (
-                    cfg.BEHAVIOR_CATEGORY in self.pj[cfg.ETHOGRAM][idx]
-                    and self.pj[cfg.ETHOGRAM][idx][cfg.BEHAVIOR_CATEGORY] == category_to_rename
-                ):
-                    behaviors_in_category.append(self.pj[cfg.ETHOGRAM][idx][cfg.BEHAVIOR_CODE])
+            behaviors_in_category = self.behaviors_by_category.get(category_to_rename, [])
 
             flag_rename = False
             if behaviors_in_category:
@@ -271,6 +262,10 @@ class BehavioralCategories(QDialog):
                     self.lw.item(self.lw.indexFromItem(selected_item).row(), 0).setText(new_category_name)
                     # check behaviors belonging to the renamed category
                     self.renamed = [category_to_rename, new_category_name]
+                    if category_to_rename in self.behaviors_by_category:
+                        self.behaviors_by_category.setdefault(new_category_name, []).extend(
+                            self.behaviors_by_category.pop(category_to_rename)
+                        )
                     self.accept()
 
 
@@ -351,6 +346,18 @@ class projectDialog(QDialog, Ui_dlgProject):
 
         self.twSubjects.cellChanged[int, int].connect(self.twSubjects_cellChanged)
 
+        # (subject name, key) of the subjects table, rebuilt after any modification of the table
+        self.subjects_snapshot = None
+        subjects_model = self.twSubjects.model()
+        for signal in (
+            subjects_model.dataChanged,
+            subjects_model.rowsInserted,
+            subjects_model.rowsRemoved,
+            subjects_model.layoutChanged,
+            subjects_model.modelReset,
+        ):
+            signal.connect(self.invalidate_subjects_snapshot)
+
         # independent variables tab
         self.pbAddVariable.clicked.connect(self.pbAddVariable_clicked)
         self.pbRemoveVariable.clicked.connect(self.pbRemoveVariable_clicked)
@@ -391,6 +398,15 @@ class projectDialog(QDialog, Ui_dlgProject):
         self.row_in_modification = -1
         self.flag_modified = False
 
+        # parsed modifiers (dict) by content of modifiers cell
+        self.modifiers_cache: dict = {}
+        # behaviors coding maps loaded by (file path, modification time)
+        self.bcm_cache: dict = {}
+        # modifiers coding maps loaded by (file path, modification time)
+        self.coding_map_cache: dict = {}
+        # (behavior codes, subject names) used in observations. The observations are not modified by the project dialog
+        self.used_in_observations = None
+
         for w in (
             self.le_converter_name,
             self.le_converter_description,
@@ -400,21 +416,44 @@ class projectDialog(QDialog, Ui_dlgProject):
         ):
             w.setEnabled(False)
 
-        # disable widget for indep var setting
-        for widget in (
+        # widgets for indep var setting
+        self.indep_var_widgets = (
             self.leLabel,
-            self.le_converter_description,
+            self.leDescription,
             self.cbType,
             self.lePredefined,
             self.dte_default_date,
             self.leSetValues,
-        ):
+        )
+        # disable widget for indep var setting
+        for widget in self.indep_var_widgets:
             widget.setEnabled(False)
 
         self.twBehaviors.horizontalHeader().sortIndicatorChanged.connect(self.sort_twBehaviors)
         self.twSubjects.horizontalHeader().sortIndicatorChanged.connect(self.sort_twSubjects)
         self.twVariables.horizontalHeader().sortIndicatorChanged.connect(self.sort_twVariables)
 
+    def parse_modifiers(self, modifiers_str: str) -> dict:
+        """
+        returns the modifiers dictionary contained in the modifiers cell of the ethogram table (JSON).
+        Cells written by older versions contain the Python representation of the dictionary.
+        Parsed dictionaries are cached by cell content and must not be modified by caller.
+
+        Args:
+            modifiers_str (str): content of the modifiers cell
+
+        Returns:
+            dict: modifiers
+        """
+        if not modifiers_str:
+            return {}
+        if modifiers_str not in self.modifiers_cache:
+            try:
+                self.modifiers_cache[modifiers_str] = json.loads(modifiers_str)
+            except json.JSONDecodeError:
+                self.modifiers_cache[modifiers_str] = ast.literal_eval(modifiers_str)
+        return self.modifiers_cache[modifiers_str]
+
     def add_button_menu(self, data, menu_obj):
         """
         add menu option from dictionary
@@ -424,14 +463,17 @@ class projectDialog(QDialog, Ui_dlgProject):
                 sub_menu = QMenu(k, menu_obj)
                 menu_obj.addMenu(sub_menu)
                 self.add_button_menu(v, sub_menu)
-        elif isinstance(data, list):
-            for element in data:
+            return
+
+        for element in data if isinstance(data, list) else (data,):
+            if isinstance(element, str):
+                tip, _, label = element.partition("|")
+                action = menu_obj.addAction(label)
+                # tips are used to discriminate the menu option
+                action.setStatusTip(tip)
+                action.setIconVisibleInMenu(False)
+            else:
                 self.add_button_menu(element, menu_obj)
-        else:
-            action = menu_obj.addAction(data.split("|")[1])
-            # tips are used to discriminate the menu option
-            action.setStatusTip(data.split("|")[0])
-            action.setIconVisibleInMenu(False)
 
     def behavior(self, action: str):
         """
@@ -526,19 +568,21 @@ class projectDialog(QDialog, Ui_dlgProject):
             )
             return
 
-        # check if some keys will be duplicated after conversion
-        try:
-            all_keys = [self.twBehaviors.item(row, cfg.behavioursFields["key"]).text() for row in range(self.twBehaviors.rowCount())]
-        except Exception:
-            pass
-        if all_keys == [x.lower() for x in all_keys]:
+        key_col = cfg.behavioursFields["key"]
+        modifiers_col = cfg.behavioursFields[cfg.MODIFIERS]
+        item = self.twBehaviors.item
+
+        # check if some keys will be duplicated after conversion (missing items are considered as empty keys)
+        all_keys: list = [item(row, key_col).text() if item(row, key_col) else "" for row in range(self.twBehaviors.rowCount())]
+        lower_case_keys = [x.lower() for x in all_keys]
+        if all_keys == lower_case_keys:
             QMessageBox.information(self, cfg.programName, "All keys are already lower case")
             return
 
         if dialog.MessageDialog(cfg.programName, "Confirm the conversion of key to lower case.", [cfg.YES, cfg.CANCEL]) == cfg.CANCEL:
             return
 
-        if len([x.lower() for x in all_keys]) != len(set([x.lower() for x in all_keys])):
+        if len(lower_case_keys) != len(set(lower_case_keys)):
             if (
                 dialog.MessageDialog(
                     cfg.programName,
@@ -550,48 +594,54 @@ class projectDialog(QDialog, Ui_dlgProject):
                 return
 
         for row in range(self.twBehaviors.rowCount()):
-            if self.twBehaviors.item(row, cfg.behavioursFields["key"]).text():
-                self.twBehaviors.item(row, cfg.behavioursFields["key"]).setText(
-                    self.twBehaviors.item(row, cfg.behavioursFields["key"]).text().lower()
-                )
+            if all_keys[row]:
+                item(row, key_col).setText(lower_case_keys[row])
 
             # convert modifier shortcuts
-            if self.twBehaviors.item(row, cfg.behavioursFields[cfg.MODIFIERS]).text():
-                modifiers_dict = (
-                    eval(self.twBehaviors.item(row, cfg.behavioursFields[cfg.MODIFIERS]).text())
-                    if self.twBehaviors.item(row, cfg.behavioursFields[cfg.MODIFIERS]).text()
-                    else {}
-                )
+            modifiers_item = item(row, modifiers_col)
+            modifiers_str = modifiers_item.text()
+            if modifiers_str:
+                modifiers_dict = copy.deepcopy(self.parse_modifiers(modifiers_str))
 
                 for modifier_set in modifiers_dict:
                     try:
                         for idx2, value in enumerate(modifiers_dict[modifier_set]["values"]):
-                            if re.findall(r"\((\w+)\)", value):
-                                modifiers_dict[modifier_set]["values"][idx2] = (
-                                    value.split("(")[0] + "(" + re.findall(r"\((\w+)\)", value)[0].lower() + ")" + value.split(")")[-1]
-                                )
+                            new_value, n = MODIFIER_KEY_RE.subn(lambda match: f"({match.group(1).lower()})", value, count=1)
+                            if n:
+                                modifiers_dict[modifier_set]["values"][idx2] = new_value
                     except Exception:
                         logging.warning("error during conversion of modifier short cut to lower case")
 
-                self.twBehaviors.item(row, cfg.behavioursFields[cfg.MODIFIERS]).setText(str(modifiers_dict))
+                modifiers_item.setText(json.dumps(modifiers_dict))
 
     def convert_subjects_keys_to_lower_case(self):
         """
         convert subjects key to lower case to help to migrate to v. 7
         """
-        # check if some keys will be duplicated after conversion
-        try:
-            all_keys = [self.twSubjects.item(row, cfg.subjectsFields.index("key")).text() for row in range(self.twSubjects.rowCount())]
-        except Exception:
-            pass
-        if all_keys == [x.lower() for x in all_keys]:
+        if not self.twSubjects.rowCount():
+            QMessageBox.critical(
+                None,
+                cfg.programName,
+                "The subjects list is empty",
+                QMessageBox.Ok | QMessageBox.Default,
+                QMessageBox.NoButton,
+            )
+            return
+
+        key_col = cfg.subjectsFields.index("key")
+        item = self.twSubjects.item
+
+        # check if some keys will be duplicated after conversion (missing items are considered as empty keys)
+        all_keys: list = [item(row, key_col).text() if item(row, key_col) else "" for row in range(self.twSubjects.rowCount())]
+        lower_case_keys = [x.lower() for x in all_keys]
+        if all_keys == lower_case_keys:
             QMessageBox.information(self, cfg.programName, "All keys are already lower case")
             return
 
         if dialog.MessageDialog(cfg.programName, "Confirm the conversion of key to lower case.", [cfg.YES, cfg.CANCEL]) == cfg.CANCEL:
             return
 
-        if len([x.lower() for x in all_keys]) != len(set([x.lower() for x in all_keys])):
+        if len(lower_case_keys) != len(set(lower_case_keys)):
             if (
                 dialog.MessageDialog(
                     cfg.programName,
@@ -603,10 +653,8 @@ class projectDialog(QDialog, Ui_dlgProject):
                 return
 
         for row in range(self.twSubjects.rowCount()):
-            if self.twSubjects.item(row, cfg.subjectsFields.index("key")).text():
-                self.twSubjects.item(row, cfg.subjectsFields.index("key")).setText(
-                    self.twSubjects.item(row, cfg.subjectsFields.index("key")).text().lower()
-                )
+            if all_keys[row]:
+                item(row, key_col).setText(lower_case_keys[row])
 
     def add_behaviors_coding_map(self):
         """
@@ -619,7 +667,11 @@ class projectDialog(QDialog, Ui_dlgProject):
         file_name = fn[0] if type(fn) is tuple else fn
         if file_name:
             try:
-                bcm = json.loads(open(file_name, "r").read())
+                bcm_key = (file_name, pl.Path(file_name).stat().st_mtime_ns)
+                if bcm_key not in self.bcm_cache:
+                    with open(file_name, "r") as f_in:
+                        self.bcm_cache[bcm_key] = json.loads(f_in.read())
+                bcm = copy.deepcopy(self.bcm_cache[bcm_key])
             except Exception:
                 QMessageBox.critical(self, cfg.programName, f"The file {file_name} is not a behaviors coding map.")
                 return
@@ -630,11 +682,10 @@ class projectDialog(QDialog, Ui_dlgProject):
             if cfg.BEHAVIORS_CODING_MAP not in self.pj:
                 self.pj[cfg.BEHAVIORS_CODING_MAP] = []
 
-            bcm_code_not_found = []
-            existing_codes = [self.pj[cfg.ETHOGRAM][key][cfg.BEHAVIOR_CODE] for key in self.pj[cfg.ETHOGRAM]]
-            for code in [bcm["areas"][key][cfg.BEHAVIOR_CODE] for key in bcm["areas"]]:
-                if code not in existing_codes:
-                    bcm_code_not_found.append(code)
+            existing_codes = {behavior[cfg.BEHAVIOR_CODE] for behavior in self.pj[cfg.ETHOGRAM].values()}
+            bcm_code_not_found = [
+                area[cfg.BEHAVIOR_CODE] for area in bcm["areas"].values() if area[cfg.BEHAVIOR_CODE] not in existing_codes
+            ]
 
             if bcm_code_not_found:
                 QMessageBox.warning(
@@ -650,19 +701,21 @@ class projectDialog(QDialog, Ui_dlgProject):
             self.twBehavCodingMap.setRowCount(self.twBehavCodingMap.rowCount() + 1)
 
             self.twBehavCodingMap.setItem(self.twBehavCodingMap.rowCount() - 1, 0, QTableWidgetItem(bcm["name"]))
-            codes = ", ".join([bcm["areas"][idx][cfg.BEHAVIOR_CODE] for idx in bcm["areas"]])
+            codes = ", ".join(area[cfg.BEHAVIOR_CODE] for area in bcm["areas"].values())
             self.twBehavCodingMap.setItem(self.twBehavCodingMap.rowCount() - 1, 1, QTableWidgetItem(codes))
 
     def remove_behaviors_coding_map(self):
         """
         remove the first selected behaviors coding map
         """
-        if not self.twBehavCodingMap.selectedIndexes():
+        selected_indexes = self.twBehavCodingMap.selectedIndexes()
+        if not selected_indexes:
             QMessageBox.warning(self, cfg.programName, "Select a behaviors coding map")
         else:
             if dialog.MessageDialog(cfg.programName, "Remove the selected behaviors coding map?", [cfg.YES, cfg.CANCEL]) == cfg.YES:
-                del self.pj[cfg.BEHAVIORS_CODING_MAP][self.twBehavCodingMap.selectedIndexes()[0].row()]
-                self.twBehavCodingMap.removeRow(self.twBehavCodingMap.selectedIndexes()[0].row())
+                row = selected_indexes[0].row()
+                del self.pj[cfg.BEHAVIORS_CODING_MAP][row]
+                self.twBehavCodingMap.removeRow(row)
 
     def leLabel_changed(self):
         if self.selected_twvariables_row != -1:
@@ -713,31 +766,55 @@ class projectDialog(QDialog, Ui_dlgProject):
             # sort
             self.pj[cfg.BEHAVIORAL_CATEGORIES] = sorted(self.pj[cfg.BEHAVIORAL_CATEGORIES])
 
-            # check if behavior belong to removed category
+            category_col = cfg.behavioursFields[cfg.BEHAVIOR_CATEGORY]
+            code_col = cfg.behavioursFields[cfg.BEHAVIOR_CODE]
+            item = self.twBehaviors.item
+
+            # rows of the ethogram table belonging to the removed or renamed category.
+            # The table is used instead of the project ethogram because it can contain unsaved modifications
+            modified_category = bc.removed if bc.removed else (bc.renamed[0] if bc.renamed else None)
+            affected_rows: list = []
+            if modified_category is not None:
+                affected_rows = [
+                    row
+                    for row in range(self.twBehaviors.rowCount())
+                    if item(row, category_col) and item(row, category_col).text() == modified_category
+                ]
+
+            # check if behavior belong to removed category.
+            # The user is asked before freezing the table
+            rows_to_clear: list = []
             if bc.removed:
-                for row in range(self.twBehaviors.rowCount()):
-                    if self.twBehaviors.item(row, cfg.behavioursFields[cfg.BEHAVIOR_CATEGORY]):
-                        if self.twBehaviors.item(row, cfg.behavioursFields[cfg.BEHAVIOR_CATEGORY]).text() == bc.removed:
-                            if (
-                                dialog.MessageDialog(
-                                    cfg.programName,
-                                    (
-                                        f"The <b>{self.twBehaviors.item(row, cfg.behavioursFields['code']).text()}</b> behavior belongs "
-                                        "to a behavioral category "
-                                        f"<b>{self.twBehaviors.item(row, cfg.behavioursFields['category']).text()}</b> "
-                                        "that is no more in the behavioral categories list.<br><br>"
-                                        "Remove the behavior from category?"
-                                    ),
-                                    [cfg.YES, cfg.CANCEL],
-                                )
-                                == cfg.YES
-                            ):
-                                self.twBehaviors.item(row, cfg.behavioursFields[cfg.BEHAVIOR_CATEGORY]).setText("")
-            if bc.renamed:
-                for row in range(self.twBehaviors.rowCount()):
-                    if self.twBehaviors.item(row, cfg.behavioursFields[cfg.BEHAVIOR_CATEGORY]):
-                        if self.twBehaviors.item(row, cfg.behavioursFields[cfg.BEHAVIOR_CATEGORY]).text() == bc.renamed[0]:
-                            self.twBehaviors.item(row, cfg.behavioursFields[cfg.BEHAVIOR_CATEGORY]).setText(bc.renamed[1])
+                for row in affected_rows:
+                    if (
+                        dialog.MessageDialog(
+                            cfg.programName,
+                            (
+                                f"The <b>{item(row, code_col).text()}</b> behavior belongs "
+                                "to a behavioral category "
+                                f"<b>{bc.removed}</b> "
+                                "that is no more in the behavioral categories list.<br><br>"
+                                "Remove the behavior from category?"
+                            ),
+                            [cfg.YES, cfg.CANCEL],
+                        )
+                        == cfg.YES
+                    ):
+                        rows_to_clear.append(row)
+
+            # no cellChanged signal and no repaint for each modified row: the ethogram is checked once at the end
+            self.twBehaviors.setUpdatesEnabled(False)
+            self.twBehaviors.blockSignals(True)
+            try:
+                for row in rows_to_clear:
+                    item(row, category_col).setText("")
+                if bc.renamed:
+                    for row in affected_rows:
+                        item(row, category_col).setText(bc.renamed[1])
+            finally:
+                self.twBehaviors.blockSignals(False)
+                self.twBehaviors.setUpdatesEnabled(True)
+            self.twBehaviors_cellChanged(0, 0)
 
     def twBehaviors_cellDoubleClicked(self, row: int, column: int) -> None:
         """
@@ -784,26 +861,60 @@ class projectDialog(QDialog, Ui_dlgProject):
             ):
                 QMessageBox.warning(self, cfg.programName, "Use the coding map to set/modify the areas")
             else:
-                subjects_list = []
-                for subject_row in range(self.twSubjects.rowCount()):
-                    key = self.twSubjects.item(subject_row, 0).text() if self.twSubjects.item(subject_row, 0) else ""
-                    subjectName = self.twSubjects.item(subject_row, 1).text().strip() if self.twSubjects.item(subject_row, 1) else ""
-                    subjects_list.append((subjectName, key))
-
-                addModifierWindow = add_modifier.addModifierDialog(self.twBehaviors.item(row, column).text(), subjects=subjects_list)
+                addModifierWindow = add_modifier.addModifierDialog(self.twBehaviors.item(row, column).text(), subjects=self.subjects_list())
                 addModifierWindow.setWindowTitle(f'Set modifiers for "{self.twBehaviors.item(row, 2).text()}" behavior')
                 if addModifierWindow.exec_():
                     self.twBehaviors.item(row, column).setText(addModifierWindow.getModifiers())
 
+    def codes_subjects_in_observations(self) -> tuple:
+        """
+        returns the behavior codes and the subject names used in the observations of the project.
+        The events are scanned only at the first call
+
+        Returns:
+            set: behavior codes used in observations
+            set: subject names used in observations
+        """
+        if self.used_in_observations is None:
+            codes: set = set()
+            subjects: set = set()
+            for observation in self.pj[cfg.OBSERVATIONS].values():
+                for event in observation[cfg.EVENTS]:
+                    codes.add(event[cfg.EVENT_BEHAVIOR_FIELD_IDX])
+                    subjects.add(event[cfg.EVENT_SUBJECT_FIELD_IDX])
+            self.used_in_observations = (codes, subjects)
+        return self.used_in_observations
+
+    def invalidate_subjects_snapshot(self, *args) -> None:
+        """
+        discard the cached list of subjects after a modification of the subjects table
+        """
+        self.subjects_snapshot = None
+
+    def subjects_list(self) -> list:
+        """
+        returns the list of (subject name, key) of the subjects table.
+        The list is rebuilt only if the subjects table was modified since the last call
+
+        Returns:
+            list: list of (subject name, key) tuples
+        """
+        if self.subjects_snapshot is None:
+            item = self.twSubjects.item
+            snapshot: list = []
+            for subject_row in range(self.twSubjects.rowCount()):
+                key = item(subject_row, 0).text() if item(subject_row, 0) else ""
+                subject_name = item(subject_row, 1).text().strip() if item(subject_row, 1) else ""
+                snapshot.append((subject_name, key))
+            self.subjects_snapshot = snapshot
+        return self.subjects_snapshot
+
     def behavior_type_doubleclicked(self, row):
         """
         select type for behavior
         """
 
-        if self.twBehaviors.item(row, cfg.behavioursFields[cfg.TYPE]).text() in cfg.BEHAVIOR_TYPES:
-            selected = cfg.BEHAVIOR_TYPES.index(self.twBehaviors.item(row, cfg.behavioursFields[cfg.TYPE]).text())
-        else:
-            selected = 0
+        selected = cfg.BEHAVIOR_TYPES_IDX.get(self.twBehaviors.item(row, cfg.behavioursFields[cfg.TYPE]).text(), 0)
 
         new_type, ok = QInputDialog.getItem(self, "Select a behavior type", "Types of behavior", cfg.BEHAVIOR_TYPES, selected, False)
 
@@ -840,11 +951,12 @@ class projectDialog(QDialog, Ui_dlgProject):
         select category for behavior
         """
 
-        categories = ["None"] + self.pj[cfg.BEHAVIORAL_CATEGORIES] if cfg.BEHAVIORAL_CATEGORIES in self.pj else ["None"]
+        categories = ["None"] + self.pj.get(cfg.BEHAVIORAL_CATEGORIES, [])
+        category_item = self.twBehaviors.item(row, cfg.behavioursFields[cfg.BEHAVIOR_CATEGORY])
 
-        if self.twBehaviors.item(row, cfg.behavioursFields[cfg.BEHAVIOR_CATEGORY]).text() in categories:
-            selected = categories.index(self.twBehaviors.item(row, cfg.behavioursFields[cfg.BEHAVIOR_CATEGORY]).text())
-        else:
+        try:
+            selected = categories.index(category_item.text())
+        except ValueError:
             selected = 0
 
         category, ok = QInputDialog.getItem(self, "Select a behavioral category", "Behavioral categories", categories, selected, False)
@@ -852,7 +964,7 @@ class projectDialog(QDialog, Ui_dlgProject):
         if ok and category:
             if category == "None":
                 category = ""
-            self.twBehaviors.item(row, cfg.behavioursFields[cfg.BEHAVIOR_CATEGORY]).setText(category)
+            category_item.setText(category)
 
     def check_variable_default_value(self, txt, varType):
         """
@@ -874,34 +986,35 @@ class projectDialog(QDialog, Ui_dlgProject):
         variable type combobox changed
         """
 
-        if self.twVariables.cellWidget(row, cfg.tw_indVarFields.index("type")).currentText() == cfg.SET_OF_VALUES:
-            if self.twVariables.item(row, cfg.tw_indVarFields.index("possible values")).text() == "NA":
-                self.twVariables.item(row, cfg.tw_indVarFields.index("possible values")).setText("Double-click to add values")
+        type_widget = self.twVariables.cellWidget(row, cfg.INDEP_VAR_TYPE_IDX)
+        possible_values_item = self.twVariables.item(row, cfg.INDEP_VAR_POSSIBLE_VALUES_IDX)
+
+        if type_widget.currentText() == cfg.SET_OF_VALUES:
+            if possible_values_item.text() == "NA":
+                possible_values_item.setText("Double-click to add values")
         else:
             # check if set of values defined
-            if self.twVariables.item(row, cfg.tw_indVarFields.index("possible values")).text() not in [
+            if possible_values_item.text() not in [
                 "NA",
                 "Double-click to add values",
             ]:
                 if dialog.MessageDialog(cfg.programName, "Erase the set of values?", [cfg.YES, cfg.CANCEL]) == cfg.CANCEL:
-                    self.twVariables.cellWidget(row, cfg.tw_indVarFields.index("type")).setCurrentIndex(cfg.SET_OF_VALUES_idx)
+                    type_widget.setCurrentIndex(cfg.SET_OF_VALUES_idx)
                     return
                 else:
-                    self.twVariables.item(row, cfg.tw_indVarFields.index("possible values")).setText("NA")
+                    possible_values_item.setText("NA")
             else:
-                self.twVariables.item(row, cfg.tw_indVarFields.index("possible values")).setText("NA")
+                possible_values_item.setText("NA")
 
         # check compatibility between variable type and default value
-        if not self.check_variable_default_value(
-            self.twVariables.item(row, cfg.tw_indVarFields.index("default value")).text(),
-            self.twVariables.cellWidget(row, cfg.tw_indVarFields.index("type")).currentIndex(),
-        ):
+        default_value = self.twVariables.item(row, cfg.INDEP_VAR_DEFAULT_VALUE_IDX).text()
+        if not self.check_variable_default_value(default_value, type_widget.currentIndex()):
             QMessageBox.warning(
                 self,
                 cfg.programName + " - Independent variables error",
                 (
-                    f"The default value ({self.twVariables.item(row, cfg.tw_indVarFields.index('default value')).text()}) "
-                    f"of variable <b>{self.twVariables.item(row, cfg.tw_indVarFields.index('label')).text()}</b> "
+                    f"The default value ({default_value}) "
+                    f"of variable <b>{self.twVariables.item(row, cfg.INDEP_VAR_LABEL_IDX).text()}</b> "
                     "is not compatible with variable type"
                 ),
             )
@@ -911,70 +1024,78 @@ class projectDialog(QDialog, Ui_dlgProject):
         check if default type is compatible with var type
         """
 
-        existing_var = []
+        item = self.twVariables.item
+        existing_var: set = set()
         for r in range(self.twVariables.rowCount()):
-            if self.twVariables.item(r, 0).text().strip().upper() in existing_var:
+            # each cell of the row is read once
+            label = item(r, cfg.INDEP_VAR_LABEL_IDX).text()
+            var_type = item(r, cfg.INDEP_VAR_TYPE_IDX).text()
+            default_value = item(r, cfg.INDEP_VAR_DEFAULT_VALUE_IDX).text()
+            possible_values = item(r, cfg.INDEP_VAR_POSSIBLE_VALUES_IDX).text()
+
+            label_key = label.strip().upper()
+            if label_key in existing_var:
                 return (
                     False,
-                    f"Row: {r + 1} - The variable label <b>{self.twVariables.item(r, 0).text()}</b> is already in use.",
+                    f"Row: {r + 1} - The variable label <b>{label}</b> is already in use.",
                 )
 
             # check if same lables
-            existing_var.append(self.twVariables.item(r, 0).text().strip().upper())
+            existing_var.add(label_key)
 
             # check default value
-            if self.twVariables.item(r, 2).text() != cfg.TIMESTAMP and not self.check_variable_default_value(
-                self.twVariables.item(r, 3).text(), self.twVariables.item(r, 2).text()
-            ):
+            if var_type != cfg.TIMESTAMP and not self.check_variable_default_value(default_value, var_type):
                 return False, (
                     f"Row: {r + 1} - "
-                    f"The default value ({self.twVariables.item(r, 3).text()}) is not compatible "
-                    f"with the variable type ({self.twVariables.item(r, 2).text()})"
+                    f"The default value ({default_value}) is not compatible "
+                    f"with the variable type ({var_type})"
                 )
 
             # check if default value in set of values
-            if self.twVariables.item(r, 2).text() == cfg.SET_OF_VALUES and self.twVariables.item(r, 4).text() == "":
-                return False, "No values were defined in set"
-
-            if (
-                self.twVariables.item(r, 2).text() == cfg.SET_OF_VALUES
-                and self.twVariables.item(r, 4).text()
-                and self.twVariables.item(r, 3).text()
-                and self.twVariables.item(r, 3).text() not in self.twVariables.item(r, 4).text().split(",")
-            ):
-                return (
-                    False,
-                    f"The default value ({self.twVariables.item(r, 3).text()}) is not contained in set of values",
-                )
+            if var_type == cfg.SET_OF_VALUES:
+                if possible_values == "":
+                    return False, "No values were defined in set"
+
+                if default_value and default_value not in set(possible_values.split(",")):
+                    return (
+                        False,
+                        f"The default value ({default_value}) is not contained in set of values",
+                    )
 
         return True, "OK"
 
     def cbtype_changed(self):
-        self.leSetValues.setVisible(self.cbType.currentText() == cfg.SET_OF_VALUES)
-        self.label_5.setVisible(self.cbType.currentText() == cfg.SET_OF_VALUES)
+        var_type = self.cbType.currentText()
+        is_set_of_values = var_type == cfg.SET_OF_VALUES
+        is_timestamp = var_type == cfg.TIMESTAMP
+
+        self.leSetValues.setVisible(is_set_of_values)
+        self.label_5.setVisible(is_set_of_values)
 
-        self.dte_default_date.setVisible(self.cbType.currentText() == cfg.TIMESTAMP)
-        self.label_9.setVisible(self.cbType.currentText() == cfg.TIMESTAMP)
-        self.lePredefined.setVisible(self.cbType.currentText() != cfg.TIMESTAMP)
-        self.label_4.setVisible(self.cbType.currentText() != cfg.TIMESTAMP)
+        self.dte_default_date.setVisible(is_timestamp)
+        self.label_9.setVisible(is_timestamp)
+        self.lePredefined.setVisible(not is_timestamp)
+        self.label_4.setVisible(not is_timestamp)
 
     def cbtype_activated(self):
-        if self.cbType.currentText() == cfg.TIMESTAMP:
-            self.twVariables.item(self.selected_twvariables_row, 3).setText(
+        row = self.selected_twvariables_row
+        var_type = self.cbType.currentText()
+        if var_type == cfg.TIMESTAMP:
+            self.twVariables.item(row, cfg.INDEP_VAR_DEFAULT_VALUE_IDX).setText(
                 self.dte_default_date.dateTime().toString("yyyy-MM-ddTHH:mm:ss.zzz")
             )
-            self.twVariables.item(self.selected_twvariables_row, 4).setText("")
+            self.twVariables.item(row, cfg.INDEP_VAR_POSSIBLE_VALUES_IDX).setText("")
         else:
-            self.twVariables.item(self.selected_twvariables_row, 3).setText(self.lePredefined.text())
-            self.twVariables.item(self.selected_twvariables_row, 4).setText("")
+            self.twVariables.item(row, cfg.INDEP_VAR_DEFAULT_VALUE_IDX).setText(self.lePredefined.text())
+            self.twVariables.item(row, cfg.INDEP_VAR_POSSIBLE_VALUES_IDX).setText("")
 
         # remove spaces after and before comma
-        if self.cbType.currentText() == cfg.SET_OF_VALUES:
-            self.twVariables.item(self.selected_twvariables_row, 4).setText(
-                ",".join([x.strip() for x in self.leSetValues.text().split(",")])
+        if var_type == cfg.SET_OF_VALUES:
+            self.twVariables.item(row, cfg.INDEP_VAR_POSSIBLE_VALUES_IDX).setText(
+                COMMA_SPACES_RE.sub(",", self.leSetValues.text()).strip()
             )
 
-        self.twVariables.item(self.selected_twvariables_row, 2).setText(self.cbType.currentText())
+        self.twVariables.item(row, cfg.INDEP_VAR_TYPE_IDX).setText(var_type)
 
         r, msg = self.check_indep_var_config()
 
@@ -1007,14 +1128,17 @@ class projectDialog(QDialog, Ui_dlgProject):
         """
         logging.debug("remove selected independent variable")
 
-        if not self.twVariables.selectedIndexes():
+        selected_indexes = self.twVariables.selectedIndexes()
+        if not selected_indexes:
             QMessageBox.warning(self, cfg.programName, "Select a variable to remove")
         else:
             if dialog.MessageDialog(cfg.programName, "Remove the selected variable?", [cfg.YES, cfg.CANCEL]) == cfg.YES:
-                self.twVariables.removeRow(self.twVariables.selectedIndexes()[0].row())
+                self.twVariables.removeRow(selected_indexes[0].row())
+                # the selection changes after the removal
+                selected_indexes = self.twVariables.selectedIndexes()
 
-        if self.twVariables.selectedIndexes():
-            self.twVariables_cellClicked(self.twVariables.selectedIndexes()[0].row(), 0)
+        if selected_indexes:
+            self.twVariables_cellClicked(selected_indexes[0].row(), 0)
         else:
             self.twVariables_cellClicked(-1, 0)
 
@@ -1040,8 +1164,21 @@ class projectDialog(QDialog, Ui_dlgProject):
             )
             return
 
+        # read the code, type and excluded behaviors of each row once
+        item = self.twBehaviors.item
+        code_col = cfg.behavioursFields[cfg.BEHAVIOR_CODE]
+        type_col = cfg.behavioursFields[cfg.TYPE]
+        excluded_col = cfg.behavioursFields["excluded"]
+        codes: list = []
+        types: list = []
+        excluded: list = []
         for row in range(self.twBehaviors.rowCount()):
-            if not self.twBehaviors.item(row, cfg.behavioursFields[cfg.BEHAVIOR_CODE]).text():
+            codes.append(item(row, code_col).text() if item(row, code_col) else "")
+            types.append(item(row, type_col).text() if item(row, type_col) else "")
+            excluded.append(item(row, excluded_col).text() if item(row, excluded_col) else "")
+
+        for row, code in enumerate(codes):
+            if not code:
                 QMessageBox.critical(
                     None,
                     cfg.programName,
@@ -1053,13 +1190,10 @@ class projectDialog(QDialog, Ui_dlgProject):
 
         ex = exclusion_matrix.ExclusionMatrix()
 
-        state_behaviors, point_behaviors, allBehaviors, excl, new_excl = [], [], [], {}, {}
+        state_behaviors, allBehaviors, excl, new_excl = [], [], {}, {}
 
         # list of point events
-        for r in range(self.twBehaviors.rowCount()):
-            if self.twBehaviors.item(r, cfg.behavioursFields[cfg.BEHAVIOR_CODE]):
-                if "Point" in self.twBehaviors.item(r, cfg.behavioursFields[cfg.TYPE]).text():
-                    point_behaviors.append(self.twBehaviors.item(r, cfg.behavioursFields[cfg.BEHAVIOR_CODE]).text())
+        point_behaviors: list = [code for code, type_ in zip(codes, types) if "Point" in type_]
 
         # check if point are present and if user want to include them in exclusion matrix
         include_point_events = cfg.NO
@@ -1070,20 +1204,15 @@ class projectDialog(QDialog, Ui_dlgProject):
                 [cfg.YES, cfg.NO],
             )
 
-        for r in range(self.twBehaviors.rowCount()):
-            if self.twBehaviors.item(r, cfg.behavioursFields[cfg.BEHAVIOR_CODE]):
-                if include_point_events == cfg.YES or (
-                    include_point_events == cfg.NO and "State" in self.twBehaviors.item(r, cfg.behavioursFields[cfg.TYPE]).text()
-                ):
-                    allBehaviors.append(self.twBehaviors.item(r, cfg.behavioursFields[cfg.BEHAVIOR_CODE]).text())
+        for code, type_, excluded_behaviors in zip(codes, types, excluded):
+            if include_point_events == cfg.YES or (include_point_events == cfg.NO and "State" in type_):
+                allBehaviors.append(code)
 
-                excl[self.twBehaviors.item(r, cfg.behavioursFields[cfg.BEHAVIOR_CODE]).text()] = (
-                    self.twBehaviors.item(r, cfg.behavioursFields["excluded"]).text().split(",")
-                )
-                new_excl[self.twBehaviors.item(r, cfg.behavioursFields[cfg.BEHAVIOR_CODE]).text()] = []
+            excl[code] = excluded_behaviors.split(",")
+            new_excl[code] = []
 
-                if "State" in self.twBehaviors.item(r, cfg.behavioursFields[cfg.TYPE]).text():
-                    state_behaviors.append(self.twBehaviors.item(r, cfg.behavioursFields[cfg.BEHAVIOR_CODE]).text())
+            if "State" in type_:
+                state_behaviors.append(code)
 
         logging.debug(f"point behaviors: {point_behaviors}")
         logging.debug(f"state behaviors: {state_behaviors}")
@@ -1106,10 +1235,11 @@ class projectDialog(QDialog, Ui_dlgProject):
         ex.twExclusions.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
 
         # first column contains all events: point + state
-        ex.twExclusions.setRowCount(len(point_behaviors + state_behaviors))
-        for idx, header in enumerate(point_behaviors + state_behaviors):
+        row_names: list = point_behaviors + state_behaviors
+        ex.twExclusions.setRowCount(len(row_names))
+        for idx, header in enumerate(row_names):
             item = QTableWidgetItem(header)
-            if header in point_behaviors:
+            if idx < len(point_behaviors):
                 item.setBackground(QColor(0, 200, 200))
             ex.twExclusions.setVerticalHeaderItem(idx, item)
         ex.twExclusions.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
@@ -1118,51 +1248,58 @@ class projectDialog(QDialog, Ui_dlgProject):
         ex.stateBehaviors = state_behaviors
         ex.point_behaviors = point_behaviors
 
+        # checkboxes by (row behavior, column behavior)
         ex.checkboxes = {}
 
         for c, c_name in enumerate(state_behaviors):
             flag_left_bottom = False
-            for r, r_name in enumerate(point_behaviors + state_behaviors):
+            for r, r_name in enumerate(row_names):
                 if c_name == r_name:
                     flag_left_bottom = True
+                    continue
 
-                if c_name != r_name:
-                    ex.checkboxes[f"{r_name}|{c_name}"] = QCheckBox()
-                    ex.checkboxes[f"{r_name}|{c_name}"].setStyleSheet("text-align: center; margin-left:50%; margin-right:50%;")
+                checkbox = QCheckBox()
+                checkbox.setStyleSheet(exclusion_matrix.CHECKBOX_STYLE_SHEET)
 
-                    if flag_left_bottom:
-                        # hide if cell in left-bottom part of table
-                        ex.checkboxes[f"{r_name}|{c_name}"].setEnabled(False)
+                if flag_left_bottom:
+                    # hide if cell in left-bottom part of table
+                    checkbox.setEnabled(False)
 
-                    # connect function when a CB is clicked
-                    ex.checkboxes[f"{r_name}|{c_name}"].clicked.connect(ex.cb_clicked)
-                    if c_name in excl[r_name]:
-                        ex.checkboxes[f"{r_name}|{c_name}"].setChecked(True)
-                    ex.twExclusions.setCellWidget(r, c, ex.checkboxes[f"{r_name}|{c_name}"])
+                # connect function when a CB is clicked
+                checkbox.clicked.connect(ex.cb_clicked)
+                if c_name in excl[r_name]:
+                    checkbox.setChecked(True)
+                ex.checkboxes[(r_name, c_name)] = checkbox
+                ex.twExclusions.setCellWidget(r, c, checkbox)
 
         ex.twExclusions.resizeColumnsToContents()
         # check corresponding checkbox
         ex.cb_clicked()
 
         if ex.exec_():
-            for c, c_name in enumerate(state_behaviors):
-                for r, r_name in enumerate(point_behaviors + state_behaviors):
-                    if c_name != r_name:
-                        if ex.twExclusions.cellWidget(r, c).isChecked():
-                            if c_name not in new_excl[r_name]:
-                                new_excl[r_name].append(c_name)
+            # one checkbox by (row behavior, column behavior) pair.
+            # The checkboxes were created column by column so the excluded behaviors keep the column order
+            for (r_name, c_name), checkbox in ex.checkboxes.items():
+                if checkbox.isChecked():
+                    new_excl[r_name].append(c_name)
 
             logging.debug(f"new exclusion matrix {new_excl}")
 
             # update excluded field
-            for r in range(self.twBehaviors.rowCount()):
-                if include_point_events == cfg.YES or (include_point_events == cfg.NO and "State" in self.twBehaviors.item(r, 0).text()):
-                    for e in excl:
-                        if e == self.twBehaviors.item(r, cfg.behavioursFields[cfg.BEHAVIOR_CODE]).text():
-                            item = QTableWidgetItem(",".join(new_excl[e]))
-                            item.setFlags(Qt.ItemIsEnabled)
-                            item.setBackground(QColor(230, 230, 230))
-                            self.twBehaviors.setItem(r, cfg.behavioursFields["excluded"], item)
+            # no cellChanged signal and no repaint for each modified row: keys and codes are not modified
+            self.twBehaviors.setUpdatesEnabled(False)
+            self.twBehaviors.blockSignals(True)
+            try:
+                for r, (code, type_) in enumerate(zip(codes, types)):
+                    if include_point_events == cfg.YES or (include_point_events == cfg.NO and "State" in type_):
+                        if code in excl:
+                            excluded_item = QTableWidgetItem(",".join(new_excl[code]))
+                            excluded_item.setFlags(Qt.ItemIsEnabled)
+                            excluded_item.setBackground(QColor(230, 230, 230))
+                            self.twBehaviors.setItem(r, excluded_col, excluded_item)
+            finally:
+                self.twBehaviors.blockSignals(False)
+                self.twBehaviors.setUpdatesEnabled(True)
 
     def remove_all_behaviors(self):
         if not self.twBehaviors.rowCount():
@@ -1178,65 +1315,54 @@ class projectDialog(QDialog, Ui_dlgProject):
         if dialog.MessageDialog(cfg.programName, "Remove all behaviors?", [cfg.YES, cfg.CANCEL]) != cfg.YES:
             return
 
-        # delete ethogram rows without behavior code
-        for r in range(self.twBehaviors.rowCount() - 1, -1, -1):
-            if not self.twBehaviors.item(r, cfg.PROJECT_BEHAVIORS_CODE_FIELD_IDX).text():
-                self.twBehaviors.removeRow(r)
+        # extract all codes used in observations
+        codesInObs, _ = self.codes_subjects_in_observations()
 
-        # extract all codes to delete
-        codesToDelete = []
-        row_mem = {}
+        # rows are removed from the bottom so the index of the rows not yet visited does not change
         for r in range(self.twBehaviors.rowCount() - 1, -1, -1):
-            if self.twBehaviors.item(r, cfg.PROJECT_BEHAVIORS_CODE_FIELD_IDX).text():
-                codesToDelete.append(self.twBehaviors.item(r, cfg.PROJECT_BEHAVIORS_CODE_FIELD_IDX).text())
-                row_mem[self.twBehaviors.item(r, cfg.PROJECT_BEHAVIORS_CODE_FIELD_IDX).text()] = r
-
-        # extract all codes used in observations
-        codesInObs = []
-        for obs in self.pj[cfg.OBSERVATIONS]:
-            events = self.pj[cfg.OBSERVATIONS][obs][cfg.EVENTS]
-            for event in events:
-                codesInObs.append(event[cfg.EVENT_BEHAVIOR_FIELD_IDX])
-
-        for codeToDelete in codesToDelete:
-            # if code to delete used in obs ask confirmation
-            if codeToDelete in codesInObs:
+            code_item = self.twBehaviors.item(r, cfg.PROJECT_BEHAVIORS_CODE_FIELD_IDX)
+            codeToDelete = code_item.text() if code_item else ""
+            # if code to delete used in obs ask confirmation (rows without behavior code are removed without asking)
+            if codeToDelete and codeToDelete in codesInObs:
                 response = dialog.MessageDialog(
                     cfg.programName,
                     f"The code <b>{codeToDelete}</b> is used in observations!",
                     ["Remove", cfg.CANCEL],
                 )
                 if response == "Remove":
-                    self.twBehaviors.removeRow(row_mem[codeToDelete])
+                    self.twBehaviors.removeRow(r)
             else:  # remove without asking
-                self.twBehaviors.removeRow(row_mem[codeToDelete])
+                self.twBehaviors.removeRow(r)
 
     def twBehaviors_cellChanged(self, row, column):
         """
         check ethogram
         """
 
-        keys, codes = [], []
+        key_idx = cfg.PROJECT_BEHAVIORS_KEY_FIELD_IDX
+        code_idx = cfg.PROJECT_BEHAVIORS_CODE_FIELD_IDX
+        item = self.twBehaviors.item
+        codes: set = set()
         self.lbObservationsState.setText("")
 
+        # stop at the first key length error, scan all rows for duplicated codes
         for r in range(self.twBehaviors.rowCount()):
-            # check key
-            if self.twBehaviors.item(r, cfg.PROJECT_BEHAVIORS_KEY_FIELD_IDX):
-                key = self.twBehaviors.item(r, cfg.PROJECT_BEHAVIORS_KEY_FIELD_IDX).text()
-                # check key length
-                if key.upper() not in list(cfg.function_keys.values()) and len(key) > 1:
+            # check key length
+            key_item = item(r, key_idx)
+            if key_item:
+                key = key_item.text()
+                if len(key) > 1 and key.upper() not in cfg.FUNCTION_KEYS_NAMES:
                     self.lbObservationsState.setText('<font color="red">Key length &gt; 1</font>')
                     return
 
-                keys.append(key)
-
             # check code
-            if self.twBehaviors.item(r, cfg.PROJECT_BEHAVIORS_CODE_FIELD_IDX):
-                if self.twBehaviors.item(r, cfg.PROJECT_BEHAVIORS_CODE_FIELD_IDX).text() in codes:
+            code_item = item(r, code_idx)
+            if code_item:
+                code = code_item.text()
+                if code in codes:
                     self.lbObservationsState.setText(f'<font color="red">Code duplicated at line {r + 1} </font>')
-                else:
-                    if self.twBehaviors.item(r, cfg.PROJECT_BEHAVIORS_CODE_FIELD_IDX).text():
-                        codes.append(self.twBehaviors.item(r, cfg.PROJECT_BEHAVIORS_CODE_FIELD_IDX).text())
+                elif code:
+                    codes.add(code)
 
     def clone_behavior(self):
         """
@@ -1253,12 +1379,13 @@ class projectDialog(QDialog, Ui_dlgProject):
             )
             return
 
-        if not self.twBehaviors.selectedIndexes():
+        selected_indexes = self.twBehaviors.selectedIndexes()
+        if not selected_indexes:
             QMessageBox.about(self, cfg.programName, "First select a behavior")
         else:
             self.twBehaviors.setRowCount(self.twBehaviors.rowCount() + 1)
 
-            row = self.twBehaviors.selectedIndexes()[0].row()
+            row = selected_indexes[0].row()
             for field in cfg.behavioursFields:
                 item = QTableWidgetItem(self.twBehaviors.item(row, cfg.behavioursFields[field]))
                 self.twBehaviors.setItem(self.twBehaviors.rowCount() - 1, cfg.behavioursFields[field], item)
@@ -1288,23 +1415,23 @@ class projectDialog(QDialog, Ui_dlgProject):
             )
             return
 
-        if not self.twBehaviors.selectedIndexes():
+        selected_indexes = self.twBehaviors.selectedIndexes()
+        if not selected_indexes:
             QMessageBox.warning(self, cfg.programName, "Select a behaviour to be removed")
             return
 
         if dialog.MessageDialog(cfg.programName, "Remove the selected behavior?", [cfg.YES, cfg.CANCEL]) == cfg.YES:
+            row = selected_indexes[0].row()
             # check if behavior already used in observations
-            codeToDelete = self.twBehaviors.item(self.twBehaviors.selectedIndexes()[0].row(), 2).text()
-            for obs_id in self.pj[cfg.OBSERVATIONS]:
-                if codeToDelete in [event[cfg.EVENT_BEHAVIOR_FIELD_IDX] for event in self.pj[cfg.OBSERVATIONS][obs_id][cfg.EVENTS]]:
-                    if (
-                        dialog.MessageDialog(cfg.programName, "The code to remove is used in observations!", [cfg.REMOVE, cfg.CANCEL])
-                        == cfg.CANCEL
-                    ):
-                        return
-                    break
+            codeToDelete = self.twBehaviors.item(row, cfg.PROJECT_BEHAVIORS_CODE_FIELD_IDX).text()
+            if codeToDelete in self.codes_subjects_in_observations()[0]:
+                if (
+                    dialog.MessageDialog(cfg.programName, "The code to remove is used in observations!", [cfg.REMOVE, cfg.CANCEL])
+                    == cfg.CANCEL
+                ):
+                    return
 
-            self.twBehaviors.removeRow(self.twBehaviors.selectedIndexes()[0].row())
+            self.twBehaviors.removeRow(row)
             self.twBehaviors_cellChanged(0, 0)
 
     def add_behavior(self):
@@ -1314,15 +1441,16 @@ class projectDialog(QDialog, Ui_dlgProject):
 
         # Add behavior to table
         self.twBehaviors.setRowCount(self.twBehaviors.rowCount() + 1)
-        for field_type in cfg.behavioursFields:
+        new_row = self.twBehaviors.rowCount() - 1
+        for field_type, field_idx in cfg.behavioursFields.items():
             item = QTableWidgetItem()
             if field_type == cfg.TYPE:
                 item.setText("Point event")
             # no manual editing, gray back ground
-            if field_type in (cfg.TYPE, cfg.COLOR, "category", cfg.MODIFIERS, "modifiers", "excluded", "coding map"):
+            if field_type in (cfg.TYPE, cfg.COLOR, "category", cfg.MODIFIERS, "excluded", "coding map"):
                 item.setFlags(Qt.ItemIsEnabled)
                 item.setBackground(QColor(230, 230, 230))
-            self.twBehaviors.setItem(self.twBehaviors.rowCount() - 1, cfg.behavioursFields[field_type], item)
+            self.twBehaviors.setItem(new_row, field_idx, item)
         self.twBehaviors.scrollToBottom()
 
     def behaviorTypeChanged(self, row):
@@ -1342,14 +1470,18 @@ class projectDialog(QDialog, Ui_dlgProject):
 
             if fileName:
                 try:
-                    new_map = json.loads(open(fileName, "r").read())
+                    coding_map_key = (fileName, pl.Path(fileName).stat().st_mtime_ns)
+                    if coding_map_key not in self.coding_map_cache:
+                        with open(fileName, "r") as f_in:
+                            self.coding_map_cache[coding_map_key] = json.loads(f_in.read())
+                    new_map = copy.deepcopy(self.coding_map_cache[coding_map_key])
                 except Exception:
                     QMessageBox.critical(self, cfg.programName, "Error reding the file")
                     return
                 self.pj[cfg.CODING_MAP][new_map["name"]] = new_map
 
                 # add modifiers from coding map areas
-                modifstr = str(
+                modifstr = json.dumps(
                     {
                         "0": {
                             "name": new_map["name"],
@@ -1387,20 +1519,17 @@ class projectDialog(QDialog, Ui_dlgProject):
         control before if subject used in observations
         """
 
-        if not self.twSubjects.selectedIndexes():
+        selected_indexes = self.twSubjects.selectedIndexes()
+        if not selected_indexes:
             QMessageBox.warning(self, cfg.programName, "Select a subject to remove")
         else:
             if dialog.MessageDialog(cfg.programName, "Remove the selected subject?", [cfg.YES, cfg.CANCEL]) == cfg.YES:
+                row = selected_indexes[0].row()
                 flagDel = False
-                if self.twSubjects.item(self.twSubjects.selectedIndexes()[0].row(), 1):
-                    subjectToDelete = self.twSubjects.item(self.twSubjects.selectedIndexes()[0].row(), 1).text()  # 1: subject name
-
-                    subjectsInObs = []
-                    for obs in self.pj[cfg.OBSERVATIONS]:
-                        events = self.pj[cfg.OBSERVATIONS][obs][cfg.EVENTS]
-                        for event in events:
-                            subjectsInObs.append(event[cfg.EVENT_SUBJECT_FIELD_IDX])
-                    if subjectToDelete in subjectsInObs:
+                if self.twSubjects.item(row, 1):
+                    subjectToDelete = self.twSubjects.item(row, 1).text()  # 1: subject name
+
+                    if subjectToDelete in self.codes_subjects_in_observations()[1]:
                         if (
                             dialog.MessageDialog(
                                 cfg.programName,
@@ -1417,7 +1546,7 @@ class projectDialog(QDialog, Ui_dlgProject):
                     flagDel = True
 
                 if flagDel:
-                    self.twSubjects.removeRow(self.twSubjects.selectedIndexes()[0].row())
+                    self.twSubjects.removeRow(row)
 
                 self.twSubjects_cellChanged(0, 0)
 
@@ -1433,30 +1562,16 @@ class projectDialog(QDialog, Ui_dlgProject):
         if dialog.MessageDialog(cfg.programName, "Remove all subjects?", [cfg.YES, cfg.CANCEL]) != cfg.YES:
             return
 
-        # delete ethogram rows without behavior code
-        for r in range(self.twSubjects.rowCount() - 1, -1, -1):
-            if not self.twSubjects.item(r, 1).text():  # no name
-                self.twSubjects.removeRow(r)
-
-        # extract all subjects names to delete
-        namesToDelete: list = []
-        row_mem: dict = {}
-        for r in range(self.twSubjects.rowCount() - 1, -1, -1):
-            if self.twSubjects.item(r, 1).text():
-                namesToDelete.append(self.twSubjects.item(r, 1).text())
-                row_mem[self.twSubjects.item(r, 1).text()] = r
-
         # extract all subjects name used in observations
-        namesInObs: list = []
-        for obs in self.pj[cfg.OBSERVATIONS]:
-            events = self.pj[cfg.OBSERVATIONS][obs][cfg.EVENTS]
-            for event in events:
-                namesInObs.append(event[cfg.EVENT_SUBJECT_FIELD_IDX])
+        _, namesInObs = self.codes_subjects_in_observations()
 
         flag_force: bool = False
-        for nameToDelete in namesToDelete:
-            # if name to delete used in obs ask confirmation
-            if nameToDelete in namesInObs and not flag_force:
+        # rows are removed from the bottom so the index of the rows not yet visited does not change
+        for r in range(self.twSubjects.rowCount() - 1, -1, -1):
+            name_item = self.twSubjects.item(r, 1)
+            nameToDelete = name_item.text() if name_item else ""
+            # if name to delete used in obs ask confirmation (rows without name are removed without asking)
+            if nameToDelete and nameToDelete in namesInObs and not flag_force:
                 response = dialog.MessageDialog(
                     cfg.programName,
                     f"The subject <b>{nameToDelete}</b> is used in observations!",
@@ -1464,12 +1579,12 @@ class projectDialog(QDialog, Ui_dlgProject):
                 )
                 if response == "Force removing of all subjects":
                     flag_force = True
-                    self.twSubjects.removeRow(row_mem[nameToDelete])
+                    self.twSubjects.removeRow(r)
 
                 if response == cfg.REMOVE:
-                    self.twSubjects.removeRow(row_mem[nameToDelete])
+                    self.twSubjects.removeRow(r)
             else:  # remove without asking
-                self.twSubjects.removeRow(row_mem[nameToDelete])
+                self.twSubjects.removeRow(r)
 
         self.twSubjects_cellChanged(0, 0)
 
@@ -1478,21 +1593,22 @@ class projectDialog(QDialog, Ui_dlgProject):
         check if subject not unique
         """
 
-        subjects: list = []
+        subjects: set = set()
         """keys: list = []"""
         self.lbSubjectsState.setText("")
 
+        item = self.twSubjects.item
+        # stop at the first key length error, scan all rows for duplicated subjects
         for r in range(self.twSubjects.rowCount()):
             # check key
-            if self.twSubjects.item(r, 0):
+            key_item = item(r, 0)
+            if key_item:
+                key = key_item.text()
                 # check key length
-                if (
-                    self.twSubjects.item(r, 0).text().upper() not in list(cfg.function_keys.values())
-                    and len(self.twSubjects.item(r, 0).text()) > 1
-                ):
+                if len(key) > 1 and key.upper() not in cfg.FUNCTION_KEYS_NAMES:
                     self.lbSubjectsState.setText(
                         (
-                            f'<font color="red">Error on key {self.twSubjects.item(r, 0).text()} for subject!</font>'
+                            f'<font color="red">Error on key {key} for subject!</font>'
                             "The key is too long (keys must be of one character"
                             " except for function keys _F1, F2..._)"
                         )
@@ -1509,12 +1625,13 @@ class projectDialog(QDialog, Ui_dlgProject):
                 """
 
             # check subject
-            if self.twSubjects.item(r, 1):
-                if self.twSubjects.item(r, 1).text() in subjects:
+            name_item = item(r, 1)
+            if name_item:
+                name = name_item.text()
+                if name in subjects:
                     self.lbSubjectsState.setText(f'<font color="red">Subject duplicated at row # {r + 1}</font>')
-                else:
-                    if self.twSubjects.item(r, 1).text():
-                        subjects.append(self.twSubjects.item(r, 1).text())
+                elif name:
+                    subjects.add(name)
 
     def twVariables_cellClicked(self, row, column):
         """
@@ -1525,51 +1642,38 @@ class projectDialog(QDialog, Ui_dlgProject):
         logging.debug(f"selected row: {self.selected_twvariables_row}")
 
         if self.selected_twvariables_row == -1:
-            for widget in (
-                self.leLabel,
-                self.leDescription,
-                self.cbType,
-                self.lePredefined,
-                self.dte_default_date,
-                self.leSetValues,
-            ):
+            for widget in self.indep_var_widgets:
                 widget.setEnabled(False)
-                self.leLabel.setText("")
-                self.leDescription.setText("")
-                self.lePredefined.setText("")
-                self.leSetValues.setText("")
+            self.leLabel.setText("")
+            self.leDescription.setText("")
+            self.lePredefined.setText("")
+            self.leSetValues.setText("")
 
-                self.cbType.clear()
+            self.cbType.clear()
             return
 
         # enable widget for indep var setting
-        for widget in (
-            self.leLabel,
-            self.leDescription,
-            self.cbType,
-            self.lePredefined,
-            self.dte_default_date,
-            self.leSetValues,
-        ):
+        for widget in self.indep_var_widgets:
             widget.setEnabled(True)
 
-        self.leLabel.setText(self.twVariables.item(row, 0).text())
+        var_type = self.twVariables.item(row, cfg.INDEP_VAR_TYPE_IDX).text()
+        default_value = self.twVariables.item(row, cfg.INDEP_VAR_DEFAULT_VALUE_IDX).text()
+
+        self.leLabel.setText(self.twVariables.item(row, cfg.INDEP_VAR_LABEL_IDX).text())
         self.leDescription.setText(self.twVariables.item(row, 1).text())
-        self.lePredefined.setText(self.twVariables.item(row, 3).text())
-        self.leSetValues.setText(self.twVariables.item(row, 4).text())
-        if self.twVariables.item(row, 2).text() == cfg.TIMESTAMP:
-            if len(self.twVariables.item(row, 3).text()) == len("yyyy-MM-ddTHH:mm:ss.zzz"):
+        self.lePredefined.setText(default_value)
+        self.leSetValues.setText(self.twVariables.item(row, cfg.INDEP_VAR_POSSIBLE_VALUES_IDX).text())
+        if var_type == cfg.TIMESTAMP:
+            if len(default_value) == len("yyyy-MM-ddTHH:mm:ss.zzz"):
                 datetime_format = "yyyy-MM-ddThh:mm:ss.zzz"
-            if len(self.twVariables.item(row, 3).text()) == len("yyyy-MM-ddTHH:mm:ss"):
+            if len(default_value) == len("yyyy-MM-ddTHH:mm:ss"):
                 datetime_format = "yyyy-MM-ddThh:mm:ss"
 
-            self.dte_default_date.setDateTime(QDateTime.fromString(self.twVariables.item(row, 3).text(), datetime_format))
+            self.dte_default_date.setDateTime(QDateTime.fromString(default_value, datetime_format))
 
         self.cbType.clear()
         self.cbType.addItems(cfg.AVAILABLE_INDEP_VAR_TYPES)
-        self.cbType.setCurrentIndex(cfg.NUMERIC_idx)
-
-        self.cbType.setCurrentIndex(cfg.AVAILABLE_INDEP_VAR_TYPES.index(self.twVariables.item(row, 2).text()))
+        self.cbType.setCurrentIndex(cfg.AVAILABLE_INDEP_VAR_TYPES_IDX.get(var_type, cfg.NUMERIC_idx))
 
     def pbCancel_clicked(self):
         if self.flag_modified:
@@ -1591,25 +1695,44 @@ class projectDialog(QDialog, Ui_dlgProject):
         # Ethogram
         # coding maps in ethogram
 
-        # check for leading/trailing space in behaviors and modifiers
-        code_with_leading_trailing_spaces, modifiers_with_leading_trailing_spaces = [], []
+        # text of the cells of each row of the ethogram by field (None for a missing cell)
+        item = self.twBehaviors.item
+        behaviours_fields = tuple(cfg.behavioursFields.items())
+        ethogram_rows: list = []
         for r in range(self.twBehaviors.rowCount()):
-            if (
-                self.twBehaviors.item(r, cfg.behavioursFields[cfg.BEHAVIOR_CODE]).text()
-                != self.twBehaviors.item(r, cfg.behavioursFields[cfg.BEHAVIOR_CODE]).text().strip()
-            ):
-                code_with_leading_trailing_spaces.append(self.twBehaviors.item(r, cfg.behavioursFields[cfg.BEHAVIOR_CODE]).text())
+            cells = {field: item(r, field_idx) for field, field_idx in behaviours_fields}
+            ethogram_rows.append({field: cell.text() if cell else None for field, cell in cells.items()})
+
+        # check for | char in code and for leading/trailing space in behaviors and modifiers
+        code_with_leading_trailing_spaces: list = []
+        modifiers_with_leading_trailing_spaces: set = set()
+        # parsed modifiers of each row (None if missing or not parsable)
+        parsed_modifiers: list = []
+        for texts in ethogram_rows:
+            code = texts[cfg.BEHAVIOR_CODE] or ""
+            if "|" in code:
+                QMessageBox.warning(
+                    self,
+                    cfg.programName,
+                    f"The pipe (|) character is not allowed in code <b>{code}</b> !",
+                )
+                return {cfg.CANCEL: True}
+            if code and (code[0].isspace() or code[-1].isspace()):
+                code_with_leading_trailing_spaces.append(code)
 
-            if self.twBehaviors.item(r, cfg.behavioursFields["modifiers"]).text():
+            modifiers_dict = None
+            if texts[cfg.MODIFIERS]:
                 try:
-                    modifiers_dict = eval(self.twBehaviors.item(r, cfg.behavioursFields["modifiers"]).text())
+                    modifiers_dict = self.parse_modifiers(texts[cfg.MODIFIERS])
                     for k in modifiers_dict:
                         for value in modifiers_dict[k]["values"]:
-                            modif_code = value.split(" (")[0]
-                            if modif_code.strip() != modif_code:
-                                modifiers_with_leading_trailing_spaces.append(modif_code)
-                except Exception:
+                            modif_code = value.partition(" (")[0]
+                            if modif_code and (modif_code[0].isspace() or modif_code[-1].isspace()):
+                                modifiers_with_leading_trailing_spaces.add(modif_code)
+                except (ValueError, SyntaxError, KeyError, TypeError, AttributeError):
+                    # cell that can not be parsed or modifiers without the expected structure
                     logging.critical("error checking leading/trailing spaces in modifiers")
+            parsed_modifiers.append(modifiers_dict)
 
         remove_leading_trailing_spaces = cfg.NO
         if code_with_leading_trailing_spaces:
@@ -1619,7 +1742,7 @@ class projectDialog(QDialog, Ui_dlgProject):
                     "<b>Warning!</b> Some leading and/or trailing spaces are present"
                     " in the following behaviors code(s):<br>"
                     "<b>"
-                    f"{'<br>'.join([util.replace_leading_trailing_chars(x, ' ', '&#9608;') for x in code_with_leading_trailing_spaces])}"
+                    f"{'<br>'.join(util.replace_leading_trailing_chars(x, ' ', '&#9608;') for x in code_with_leading_trailing_spaces)}"
                     "</b><br><br>"
                     "Do you want to remove the leading and trailing spaces (visualized as black boxes) from behaviors?<br><br>"
                     """<font color="red"><b>Be careful with this option"""
@@ -1637,7 +1760,7 @@ class projectDialog(QDialog, Ui_dlgProject):
                 (
                     "<b>Warning!</b> Some leading and/or trailing spaces are present"
                     " in the following modifier(s):<br><b>"
-                    f"{'<br>'.join([util.replace_leading_trailing_chars(x, ' ', '&#9608;') for x in set(modifiers_with_leading_trailing_spaces)])}"
+                    f"{'<br>'.join(util.replace_leading_trailing_chars(x, ' ', '&#9608;') for x in modifiers_with_leading_trailing_spaces)}"
                     "</b><br><br>Do you want to remove the leading and trailing spaces (visualized as black boxes) from modifiers?<br><br>"
                     """<font color="red"><b>Be careful with this option"""
                     """ if you have already done observations!</b></font>"""
@@ -1647,66 +1770,50 @@ class projectDialog(QDialog, Ui_dlgProject):
         if remove_leading_trailing_spaces_in_modifiers == cfg.CANCEL:
             return {cfg.CANCEL: True}
 
-        codingMapsList = []
-        for r in range(self.twBehaviors.rowCount()):
+        codingMapsList: set = set()
+        for r, texts in enumerate(ethogram_rows):
             row = {}
-            for field in cfg.behavioursFields:
-                if self.twBehaviors.item(r, cfg.behavioursFields[field]):
-                    # check for | char in code
-                    if field == cfg.BEHAVIOR_CODE and "|" in self.twBehaviors.item(r, cfg.behavioursFields[field]).text():
-                        QMessageBox.warning(
-                            self,
-                            cfg.programName,
-                            (
-                                "The pipe (|) character is not allowed in code "
-                                f"<b>{self.twBehaviors.item(r, cfg.behavioursFields[field]).text()}</b> !"
-                            ),
-                        )
-                        return {cfg.CANCEL: True}
-
+            for field, text in texts.items():
+                if text is not None:
                     if remove_leading_trailing_spaces == cfg.YES:
-                        row[field] = self.twBehaviors.item(r, cfg.behavioursFields[field]).text().strip()
+                        row[field] = text.strip()
                     else:
-                        row[field] = self.twBehaviors.item(r, cfg.behavioursFields[field]).text()
+                        row[field] = text
 
                     if field == "modifiers" and row["modifiers"]:
                         if remove_leading_trailing_spaces_in_modifiers == cfg.YES:
                             try:
-                                modifiers_dict = eval(row["modifiers"])
+                                modifiers_dict = copy.deepcopy(parsed_modifiers[r])
                                 for k in modifiers_dict:
                                     for idx, value in enumerate(modifiers_dict[k]["values"]):
-                                        modif_code = value.split(" (")[0]
+                                        modif_code = value.partition(" (")[0]
 
-                                        modifiers_dict[k]["values"][idx] = modifiers_dict[k]["values"][idx].replace(
-                                            modif_code, modif_code.strip()
-                                        )
+                                        modifiers_dict[k]["values"][idx] = modif_code.strip() + value[len(modif_code) :]
 
                                 row["modifiers"] = dict(modifiers_dict)
-                            except Exception:
+                            except (ValueError, SyntaxError, KeyError, TypeError, AttributeError):
                                 logging.critical("Error removing leading/trailing spaces in modifiers")
 
                                 QMessageBox.critical(self, cfg.programName, "Error removing leading/trailing spaces in modifiers")
 
+                        elif parsed_modifiers[r] is not None:
+                            row["modifiers"] = copy.deepcopy(parsed_modifiers[r])
                         else:
-                            row["modifiers"] = eval(row["modifiers"])
+                            row["modifiers"] = copy.deepcopy(self.parse_modifiers(row["modifiers"]))
                 else:
                     row[field] = ""
 
             if (row["type"]) and (row[cfg.BEHAVIOR_CODE]):
-                checked_ethogram[str(len(checked_ethogram))] = row
+                # the ethogram is rejected if a row has missing data so the row index is used as key
+                checked_ethogram[str(r)] = row
             else:
                 missing_data.append(str(r + 1))
 
-            if self.twBehaviors.item(r, cfg.behavioursFields["coding map"]).text():
-                codingMapsList.append(self.twBehaviors.item(r, cfg.behavioursFields["coding map"]).text())
+            if texts["coding map"]:
+                codingMapsList.add(texts["coding map"])
 
         # remove coding map from project if not in ethogram
-        cmToDelete = []
-        for cm in self.pj[cfg.CODING_MAP]:
-            if cm not in codingMapsList:
-                cmToDelete.append(cm)
-
-        for cm in cmToDelete:
+        for cm in self.pj[cfg.CODING_MAP].keys() - codingMapsList:
             del self.pj[cfg.CODING_MAP][cm]
 
         if missing_data:
@@ -1714,24 +1821,23 @@ class projectDialog(QDialog, Ui_dlgProject):
             return {cfg.CANCEL: True}
 
         # check if behavior belong to category that is not in categories list
-        behavior_category = []
-        for idx in checked_ethogram:
-            if cfg.BEHAVIOR_CATEGORY in checked_ethogram[idx]:
-                if checked_ethogram[idx][cfg.BEHAVIOR_CATEGORY]:
-                    if checked_ethogram[idx][cfg.BEHAVIOR_CATEGORY] not in self.pj[cfg.BEHAVIORAL_CATEGORIES]:
-                        behavior_category.append((checked_ethogram[idx][cfg.BEHAVIOR_CODE], checked_ethogram[idx][cfg.BEHAVIOR_CATEGORY]))
+        defined_categories = set(self.pj[cfg.BEHAVIORAL_CATEGORIES])
+        behavior_category = [
+            (behavior[cfg.BEHAVIOR_CODE], behavior[cfg.BEHAVIOR_CATEGORY])
+            for behavior in checked_ethogram.values()
+            if behavior.get(cfg.BEHAVIOR_CATEGORY) and behavior[cfg.BEHAVIOR_CATEGORY] not in defined_categories
+        ]
         if behavior_category:
+            # dict keys keep the first occurrence order and remove duplicates
+            undefined_categories = dict.fromkeys(category for _, category in behavior_category)
+            used_with = dict.fromkeys(f"<b>{category}</b> (used with <b>{code}</b>)" for code, category in behavior_category)
             response = dialog.MessageDialog(
                 f"{cfg.programName} - Behavioral categories",
-                (
-                    "The behavioral categorie(s) "
-                    f"{', '.join(set(['<b>' + x[1] + '</b>' + ' (used with <b>' + x[0] + '</b>)' for x in behavior_category]))} "
-                    "are no more defined in behavioral categories list"
-                ),
+                f"The behavioral categorie(s) {', '.join(used_with)} are no more defined in behavioral categories list",
                 ["Add behavioral category/ies", "Ignore", cfg.CANCEL],
             )
             if response == "Add behavioral category/ies":
-                [self.pj[cfg.BEHAVIORAL_CATEGORIES].append(x1) for x1 in set(x[1] for x in behavior_category)]
+                self.pj[cfg.BEHAVIORAL_CATEGORIES].extend(undefined_categories)
             if response == cfg.CANCEL:
                 return {cfg.CANCEL: True}
 
@@ -1764,12 +1870,17 @@ class projectDialog(QDialog, Ui_dlgProject):
         # store subjects
         self.subjects_conf: dict = {}
 
-        # check for leading/trailing spaces in subjects names
-        subjects_name_with_leading_trailing_spaces = ""
+        # text of the key, name and description cells of each subject (None for a missing cell)
+        item = self.twSubjects.item
+        subjects_rows: list = []
         for row in range(self.twSubjects.rowCount()):
-            if self.twSubjects.item(row, 1):
-                if self.twSubjects.item(row, 1).text() != self.twSubjects.item(row, 1).text().strip():
-                    subjects_name_with_leading_trailing_spaces += f'"{self.twSubjects.item(row, 1).text()}" '
+            cells = (item(row, 0), item(row, 1), item(row, 2))
+            subjects_rows.append(tuple(cell.text() if cell else None for cell in cells))
+
+        # check for leading/trailing spaces in subjects names
+        subjects_name_with_leading_trailing_spaces = [
+            f'"{name}"' for _, name, _ in subjects_rows if name and (name[0].isspace() or name[-1].isspace())
+        ]
 
         remove_leading_trailing_spaces = cfg.NO
         if subjects_name_with_leading_trailing_spaces:
@@ -1777,7 +1888,7 @@ class projectDialog(QDialog, Ui_dlgProject):
                 cfg.programName,
                 (
                     "Attention! Some leading and/or trailing spaces are present in the following <b>subject name(s)</b>:<br>"
-                    f"<b>{subjects_name_with_leading_trailing_spaces}</b><br><br>"
+                    f"<b>{' '.join(subjects_name_with_leading_trailing_spaces)}</b><br><br>"
                     "Do you want to remove the leading and trailing spaces?<br><br>"
                     '<font color="red"><b>Be careful with this option'
                     " if you have already done observations!</b></font>"
@@ -1786,19 +1897,15 @@ class projectDialog(QDialog, Ui_dlgProject):
             )
 
         # check subjects
-        for row in range(self.twSubjects.rowCount()):
+        for row, (key, subjectName, subjectDescription) in enumerate(subjects_rows):
             # check key
-            if self.twSubjects.item(row, 0):
-                key = self.twSubjects.item(row, 0).text()
-            else:
+            if key is None:
                 key = ""
 
             # check subject name
-            if self.twSubjects.item(row, 1):
+            if subjectName is not None:
                 if remove_leading_trailing_spaces == cfg.YES:
-                    subjectName = self.twSubjects.item(row, 1).text().strip()
-                else:
-                    subjectName = self.twSubjects.item(row, 1).text()
+                    subjectName = subjectName.strip()
 
                 # check if subject name is empty
                 if subjectName == "":
@@ -1817,23 +1924,21 @@ class projectDialog(QDialog, Ui_dlgProject):
                 return
 
             # description
-            subjectDescription = ""
-            if self.twSubjects.item(row, 2):
-                subjectDescription = self.twSubjects.item(row, 2).text().strip()
+            subjectDescription = subjectDescription.strip() if subjectDescription is not None else ""
 
-            self.subjects_conf[str(len(self.subjects_conf))] = {
+            self.subjects_conf[str(row)] = {
                 "key": key,
                 "name": subjectName,
                 "description": subjectDescription,
             }
 
-        self.pj[cfg.SUBJECTS] = dict(self.subjects_conf)
+        self.pj[cfg.SUBJECTS] = self.subjects_conf
 
         # check ethogram
-        r = dict(self.check_ethogram())
+        r = self.check_ethogram()
         if cfg.CANCEL in r:
             return
-        self.pj[cfg.ETHOGRAM] = dict(r)
+        self.pj[cfg.ETHOGRAM] = r
 
         # independent variables
         r, msg = self.check_indep_var_config()
@@ -1842,12 +1947,16 @@ class projectDialog(QDialog, Ui_dlgProject):
             return
 
         self.indVar = {}
+        item = self.twVariables.item
+        indep_var_fields = tuple(enumerate(cfg.tw_indVarFields))
         for r in range(self.twVariables.rowCount()):
             row = {}
-            for idx, field in enumerate(cfg.tw_indVarFields):
-                if self.twVariables.item(r, idx):
+            for idx, field in indep_var_fields:
+                cell = item(r, idx)
+                if cell:
+                    text = cell.text()
                     # check if label is empty
-                    if field == "label" and self.twVariables.item(r, idx).text() == "":
+                    if field == "label" and text == "":
                         QMessageBox.warning(
                             self,
                             cfg.programName,
@@ -1855,23 +1964,25 @@ class projectDialog(QDialog, Ui_dlgProject):
                         )
                         return
 
-                    row[field] = self.twVariables.item(r, idx).text().strip()
+                    row[field] = text.strip()
                 else:
                     row[field] = ""
 
-            self.indVar[str(len(self.indVar))] = row
+            self.indVar[str(r)] = row
 
-        self.pj[cfg.INDEPENDENT_VARIABLES] = dict(self.indVar)
+        self.pj[cfg.INDEPENDENT_VARIABLES] = self.indVar
 
         # converters
         converters = {}
+        item = self.tw_converters.item
         for row in range(self.tw_converters.rowCount()):
-            converters[self.tw_converters.item(row, 0).text()] = {
-                "name": self.tw_converters.item(row, 0).text(),
-                "description": self.tw_converters.item(row, 1).text(),
-                "code": self.tw_converters.item(row, 2).text().replace("@", "\n"),
+            name = item(row, 0).text()
+            converters[name] = {
+                "name": name,
+                "description": item(row, 1).text(),
+                "code": item(row, 2).text().replace("@", "\n"),
             }
-        self.pj[cfg.CONVERTERS] = dict(converters)
+        self.pj[cfg.CONVERTERS] = converters
 
         self.accept()
 
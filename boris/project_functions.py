@@ -19,6 +19,7 @@ Copyright 2012-2024 Olivier Friard
   MA 02110-1301, USA.
 """
 
+import bisect
 import gzip
 import json
 import logging
@@ -27,7 +28,7 @@ import pathlib as pl
 import sys
 from decimal import Decimal as dec
 from shutil import copyfile
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Iterable, Optional
 
 import tablib
 from PyQt5.QtWidgets import QMessageBox, QTableWidgetItem, QAbstractItemView
@@ -36,7 +37,6 @@ from PyQt5.QtCore import Qt
 from . import config as cfg
 from . import db_functions
 from . import dialog
-from . import portion as I
 from . import utilities as util
 from . import version
 from . import observation_operations
@@ -44,7 +44,7 @@ from . import observation_operations
 
 def check_observation_exhaustivity(
     events: List[list],
-    state_events_list: list = [],
+    state_events_list: Iterable = (),
 ) -> float:
     """
     calculate the observation exhaustivity
@@ -52,61 +52,55 @@ def check_observation_exhaustivity(
 
     Args:
         events (List[list]): events
-        ethogram (list):
+        state_events_list (Iterable): codes of the state events
     """
 
-    def interval_len(interval: I) -> dec:
-        """ "
-        returns duration of an interval or a set of intervals
-        """
-        if interval.empty:
-            return dec(0)
-        else:
-            return dec(sum([x.upper - x.lower for x in interval]))
-
+    # intervals of state events by subject (point events have no duration)
     events_interval: dict = {}
     mem_events_interval: dict = {}
 
-    for event in events:
-        if event[cfg.EVENT_SUBJECT_FIELD_IDX] not in events_interval:
-            events_interval[event[cfg.EVENT_SUBJECT_FIELD_IDX]] = {}
-            mem_events_interval[event[cfg.EVENT_SUBJECT_FIELD_IDX]] = {}
+    # set for constant time membership test
+    state_events = frozenset(state_events_list)
 
-        if event[cfg.EVENT_BEHAVIOR_FIELD_IDX] not in events_interval[event[cfg.EVENT_SUBJECT_FIELD_IDX]]:
-            events_interval[event[cfg.EVENT_SUBJECT_FIELD_IDX]][event[cfg.EVENT_BEHAVIOR_FIELD_IDX]] = I.empty()
-            mem_events_interval[event[cfg.EVENT_SUBJECT_FIELD_IDX]][event[cfg.EVENT_BEHAVIOR_FIELD_IDX]] = []
+    subject_idx, behavior_idx, time_idx = cfg.EVENT_SUBJECT_FIELD_IDX, cfg.EVENT_BEHAVIOR_FIELD_IDX, cfg.EVENT_TIME_FIELD_IDX
+    # first and last timestamps
+    time_min, time_max = None, None
+    for event in events:
+        subject, behavior, time_ = event[subject_idx], event[behavior_idx], event[time_idx]
+        if time_min is None or time_ < time_min:
+            time_min = time_
+        if time_max is None or time_ > time_max:
+            time_max = time_
+        subject_intervals = events_interval.setdefault(subject, [])
+        subject_mem = mem_events_interval.setdefault(subject, {})
 
         # state event
-        if event[cfg.EVENT_BEHAVIOR_FIELD_IDX] in state_events_list:
-            mem_events_interval[event[cfg.EVENT_SUBJECT_FIELD_IDX]][event[cfg.EVENT_BEHAVIOR_FIELD_IDX]].append(
-                event[cfg.EVENT_TIME_FIELD_IDX]
-            )
-            if len(mem_events_interval[event[cfg.EVENT_SUBJECT_FIELD_IDX]][event[cfg.EVENT_BEHAVIOR_FIELD_IDX]]) == 2:
-                events_interval[event[cfg.EVENT_SUBJECT_FIELD_IDX]][event[cfg.EVENT_BEHAVIOR_FIELD_IDX]] |= I.closedopen(
-                    mem_events_interval[event[cfg.EVENT_SUBJECT_FIELD_IDX]][event[cfg.EVENT_BEHAVIOR_FIELD_IDX]][0],
-                    mem_events_interval[event[cfg.EVENT_SUBJECT_FIELD_IDX]][event[cfg.EVENT_BEHAVIOR_FIELD_IDX]][1],
-                )
-                mem_events_interval[event[cfg.EVENT_SUBJECT_FIELD_IDX]][event[cfg.EVENT_BEHAVIOR_FIELD_IDX]] = []
-        # point event
-        else:
-            events_interval[event[cfg.EVENT_SUBJECT_FIELD_IDX]][event[cfg.EVENT_BEHAVIOR_FIELD_IDX]] |= I.singleton(
-                event[cfg.EVENT_TIME_FIELD_IDX]
-            )
-
-    if events:
-        # coding duration
-        event_timestamps = [event[cfg.EVENT_TIME_FIELD_IDX] for event in events]
-        obs_theo_dur = max(event_timestamps) - min(event_timestamps)
-    else:
-        obs_theo_dur = dec("0")
+        if behavior in state_events:
+            mem = subject_mem.setdefault(behavior, [])
+            mem.append(time_)
+            if len(mem) == 2:
+                start, stop = mem
+                if stop > start:
+                    subject_intervals.append((start, stop))
+                subject_mem[behavior] = []
+
+    # coding duration
+    obs_theo_dur = time_max - time_min if events else dec("0")
 
     total_duration = 0
-    for subject in events_interval:
-        tot_behav_for_subject = I.empty()
-        for behav in events_interval[subject]:
-            tot_behav_for_subject |= events_interval[subject][behav]
-
-        obs_real_dur = interval_len(tot_behav_for_subject)
+    for subject_intervals in events_interval.values():
+        # length of the union of the intervals: merge the sorted intervals and sum the merged spans
+        obs_real_dur = dec(0)
+        current_start, current_stop = None, None
+        for start, stop in sorted(subject_intervals):
+            if current_stop is None or start > current_stop:
+                if current_stop is not None:
+                    obs_real_dur += current_stop - current_start
+                current_start, current_stop = start, stop
+            elif stop > current_stop:
+                current_stop = stop
+        if current_stop is not None:
+            obs_real_dur += current_stop - current_start
 
         if obs_real_dur >= obs_theo_dur:
             obs_real_dur = obs_theo_dur
@@ -162,12 +156,14 @@ def behavior_category(ethogram: dict) -> Dict[str, str]:
     return behavioral_category
 
 
-def check_if_media_available(observation: dict, project_file_name: str) -> Tuple[bool, str]:
+def check_if_media_available(observation: dict, project_file_name: str, full_paths: Optional[dict] = None) -> Tuple[bool, str]:
     """
     check if media files available for media and images observations
 
     Args:
         observation (dict): observation to be checked
+        project_file_name (str): project file name
+        full_paths (dict): full paths already resolved (path: full path). Shared by the caller to check many observations
 
     Returns:
         bool: True if media files found or for live observation
@@ -177,10 +173,18 @@ def check_if_media_available(observation: dict, project_file_name: str) -> Tuple
     if observation[cfg.TYPE] == cfg.LIVE:
         return (True, "")
 
+    if full_paths is None:
+        full_paths = {}
+
+    def resolved(path: str) -> str:
+        if path not in full_paths:
+            full_paths[path] = full_path(path, project_file_name)
+        return full_paths[path]
+
     # TODO: check all files before returning False
     if observation[cfg.TYPE] == cfg.IMAGES:
         for img_dir in observation.get(cfg.DIRECTORIES_LIST, []):
-            if not full_path(img_dir, project_file_name):
+            if not resolved(img_dir):
                 return (False, f"The images directory <b>{img_dir}</b> was not found")
         return (True, "")
 
@@ -190,7 +194,7 @@ def check_if_media_available(observation: dict, project_file_name: str) -> Tuple
                 if not isinstance(observation[cfg.FILE][nplayer], list):
                     return (False, "error")
                 for media_file in observation[cfg.FILE][nplayer]:
-                    if not full_path(media_file, project_file_name):
+                    if not resolved(media_file):
                         return (False, f"Media file <b>{media_file}</b> was not found")
         return (True, "")
 
@@ -223,16 +227,14 @@ def check_coded_behaviors_in_obs_list(pj: dict, observations_list: list) -> bool
     """
     check if coded behaviors in a list of observations are defined in the ethogram
     """
-    out = ""
     ethogram_behavior_codes = {pj[cfg.ETHOGRAM][idx][cfg.BEHAVIOR_CODE] for idx in pj[cfg.ETHOGRAM]}
-    behaviors_not_defined = []
+    coded_behaviors: set = set()
     out = ""  # will contain the output
     for obs_id in observations_list:
-        for event in pj[cfg.OBSERVATIONS][obs_id][cfg.EVENTS]:
-            if event[cfg.EVENT_BEHAVIOR_FIELD_IDX] not in ethogram_behavior_codes:
-                behaviors_not_defined.append(event[cfg.EVENT_BEHAVIOR_FIELD_IDX])
-    if set(sorted(behaviors_not_defined)):
-        out += f"The following behaviors are not defined in the ethogram: <b>{', '.join(set(sorted(behaviors_not_defined)))}</b><br><br>"
+        coded_behaviors.update(event[cfg.EVENT_BEHAVIOR_FIELD_IDX] for event in pj[cfg.OBSERVATIONS][obs_id][cfg.EVENTS])
+    behaviors_not_defined = coded_behaviors - ethogram_behavior_codes
+    if behaviors_not_defined:
+        out += f"The following behaviors are not defined in the ethogram: <b>{', '.join(sorted(behaviors_not_defined))}</b><br><br>"
         results = dialog.Results_dialog()
         results.setWindowTitle(f"{cfg.programName} - Check selected observations")
         results.ptText.setReadOnly(True)
@@ -257,16 +259,21 @@ def check_coded_behaviors(pj: dict) -> set:
 
     # set of behaviors defined in ethogram
     ethogram_behavior_codes = {pj[cfg.ETHOGRAM][idx][cfg.BEHAVIOR_CODE] for idx in pj[cfg.ETHOGRAM]}
-    behaviors_not_defined = []
+    coded_behaviors: set = set()
 
-    for obs_id in pj[cfg.OBSERVATIONS]:
-        for event in pj[cfg.OBSERVATIONS][obs_id][cfg.EVENTS]:
-            if event[cfg.EVENT_BEHAVIOR_FIELD_IDX] not in ethogram_behavior_codes:
-                behaviors_not_defined.append(event[cfg.EVENT_BEHAVIOR_FIELD_IDX])
-    return set(sorted(behaviors_not_defined))
+    for observation in pj[cfg.OBSERVATIONS].values():
+        coded_behaviors.update(event[cfg.EVENT_BEHAVIOR_FIELD_IDX] for event in observation[cfg.EVENTS])
+    return coded_behaviors - ethogram_behavior_codes
 
 
-def check_state_events_obs(obsId: str, ethogram: dict, observation: dict, time_format: str = cfg.HHMMSS) -> Tuple[bool, str]:
+def check_state_events_obs(
+    obsId: str,
+    ethogram: dict,
+    observation: dict,
+    time_format: str = cfg.HHMMSS,
+    state_behaviors: Optional[frozenset] = None,
+    event_types: Optional[set] = None,
+) -> Tuple[bool, str]:
     """
     check state events for the observation obsId
     check if behaviors in observation are defined in ethogram
@@ -277,6 +284,8 @@ def check_state_events_obs(obsId: str, ethogram: dict, observation: dict, time_f
         ethogram (dict): ethogram of project
         observation (dict): observation to be checked
         time_format (str): time format
+        state_behaviors (frozenset): codes of the state events (determined from ethogram if None)
+        event_types (set): types of the ethogram behaviors (determined from ethogram if None)
 
     Returns:
         tuple (bool, str): if OK True else False , message
@@ -285,51 +294,41 @@ def check_state_events_obs(obsId: str, ethogram: dict, observation: dict, time_f
     out = ""
 
     # check if behaviors are defined as "state event"
-    event_types = {ethogram[idx]["type"] for idx in ethogram}
+    if event_types is None:
+        event_types = {ethogram[idx]["type"] for idx in ethogram}
 
     if not event_types or event_types == {"Point event"}:
         return (True, "No behavior is defined as `State event`")
 
-    subjects = [event[cfg.EVENT_SUBJECT_FIELD_IDX] for event in observation[cfg.EVENTS]]
-    ethogram_behaviors = {ethogram[idx][cfg.BEHAVIOR_CODE] for idx in ethogram}
+    if state_behaviors is None:
+        state_behaviors = frozenset(util.state_behavior_codes(ethogram))
 
-    for subject in sorted(set(subjects)):
-        behaviors = [
-            event[cfg.EVENT_BEHAVIOR_FIELD_IDX] for event in observation[cfg.EVENTS] if event[cfg.EVENT_SUBJECT_FIELD_IDX] == subject
-        ]
+    # events grouped by (subject, behavior) in a single pass
+    events_by_subject_behavior: dict = {}
+    for event in observation[cfg.EVENTS]:
+        events_by_subject_behavior.setdefault((event[cfg.EVENT_SUBJECT_FIELD_IDX], event[cfg.EVENT_BEHAVIOR_FIELD_IDX]), []).append(event)
 
-        for behavior in sorted(set(behaviors)):
-            if behavior not in ethogram_behaviors:
-                # return (False, "The behaviour <b>{}</b> is not defined in the ethogram.<br>".format(behavior))
-                continue
+    for subject, behavior in sorted(events_by_subject_behavior):
+        # behaviors not defined in the ethogram and point events are not checked
+        if behavior not in state_behaviors:
+            continue
+
+        # toggle the start time of the unpaired occurrence of each modifier (insertion order is kept)
+        not_paired: dict = {}
+        for event in events_by_subject_behavior[(subject, behavior)]:
+            modifier = event[cfg.EVENT_MODIFIER_FIELD_IDX]
+            if modifier in not_paired:
+                del not_paired[modifier]
             else:
-                if cfg.STATE in event_type(behavior, ethogram).upper():
-                    lst: list = []
-                    memTime: dict = {}
-                    for event in [
-                        event
-                        for event in observation[cfg.EVENTS]
-                        if event[cfg.EVENT_BEHAVIOR_FIELD_IDX] == behavior and event[cfg.EVENT_SUBJECT_FIELD_IDX] == subject
-                    ]:
-                        behav_modif = [
-                            event[cfg.EVENT_BEHAVIOR_FIELD_IDX],
-                            event[cfg.EVENT_MODIFIER_FIELD_IDX],
-                        ]
-
-                        if behav_modif in lst:
-                            lst.remove(behav_modif)
-                            del memTime[str(behav_modif)]
-                        else:
-                            lst.append(behav_modif)
-                            memTime[str(behav_modif)] = event[cfg.EVENT_TIME_FIELD_IDX]
-
-                    for event in lst:
-                        out += (
-                            f"The behavior <b>{behavior}</b> "
-                            f"{('(modifier ' + event[1] + ') ') if event[1] else ''} is not PAIRED "
-                            f'for subject "<b>{subject if subject else cfg.NO_FOCAL_SUBJECT}</b>" at '
-                            f"<b>{memTime[str(event)] if time_format == cfg.S else util.seconds2time(memTime[str(event)])}</b><br>"
-                        )
+                not_paired[modifier] = event[cfg.EVENT_TIME_FIELD_IDX]
+
+        for modifier, time_ in not_paired.items():
+            out += (
+                f"The behavior <b>{behavior}</b> "
+                f"{('(modifier ' + modifier + ') ') if modifier else ''} is not PAIRED "
+                f'for subject "<b>{subject if subject else cfg.NO_FOCAL_SUBJECT}</b>" at '
+                f"<b>{time_ if time_format == cfg.S else util.seconds2time(time_)}</b><br>"
+            )
 
     return (False, out) if out else (True, "No problem detected")
 
@@ -344,8 +343,12 @@ def check_state_events(pj: dict, observations_list: list) -> Tuple[bool, tuple]:
 
     out = ""
     not_paired_obs_list = []
+    state_behaviors = frozenset(util.state_behavior_codes(pj[cfg.ETHOGRAM]))
+    event_types = {pj[cfg.ETHOGRAM][idx]["type"] for idx in pj[cfg.ETHOGRAM]}
     for obs_id in observations_list:
-        r, msg = check_state_events_obs(obs_id, pj[cfg.ETHOGRAM], pj[cfg.OBSERVATIONS][obs_id])
+        r, msg = check_state_events_obs(
+            obs_id, pj[cfg.ETHOGRAM], pj[cfg.OBSERVATIONS][obs_id], state_behaviors=state_behaviors, event_types=event_types
+        )
 
         if not r:
             out += f"Observation: <strong>{obs_id}</strong><br>{msg}<br>"
@@ -363,7 +366,8 @@ def check_state_events(pj: dict, observations_list: list) -> Tuple[bool, tuple]:
             return True, []
 
     # remove observations with unpaired state events
-    new_observations_list = [x for x in observations_list if x not in not_paired_obs_list]
+    not_paired_obs = set(not_paired_obs_list)
+    new_observations_list = [x for x in observations_list if x not in not_paired_obs]
     if not new_observations_list:
         QMessageBox.warning(None, cfg.programName, "The observation list is empty")
 
@@ -398,27 +402,38 @@ def check_project_integrity(
     Returns:
         str: message
     """
-    out = ""
+    out: list = []
 
     # check if coded behaviors are defined in ethogram
     r = check_coded_behaviors(pj)
     if r:
-        out += f"The following behaviors are not defined in the ethogram: <b>{', '.join(r)}</b><br>"
+        out.append(f"The following behaviors are not defined in the ethogram: <b>{', '.join(sorted(r))}</b><br>")
 
     # check for unpaired state events
+    state_behaviors = frozenset(util.state_behavior_codes(pj[cfg.ETHOGRAM]))
+    event_types = {pj[cfg.ETHOGRAM][idx]["type"] for idx in pj[cfg.ETHOGRAM]}
     for obs_id in pj[cfg.OBSERVATIONS]:
-        ok, msg = check_state_events_obs(obs_id, pj[cfg.ETHOGRAM], pj[cfg.OBSERVATIONS][obs_id], time_format)
+        ok, msg = check_state_events_obs(
+            obs_id,
+            pj[cfg.ETHOGRAM],
+            pj[cfg.OBSERVATIONS][obs_id],
+            time_format,
+            state_behaviors=state_behaviors,
+            event_types=event_types,
+        )
         if not ok:
-            out += "<br><br>" if out else ""
-            out += f"Observation: <b>{obs_id}</b><br>{msg}"
+            if out:
+                out.append("<br><br>")
+            out.append(f"Observation: <b>{obs_id}</b><br>{msg}")
 
     # check if behavior belong to category that is not in categories list
     for idx in pj[cfg.ETHOGRAM]:
         if cfg.BEHAVIOR_CATEGORY in pj[cfg.ETHOGRAM][idx]:
             if pj[cfg.ETHOGRAM][idx][cfg.BEHAVIOR_CATEGORY]:
                 if pj[cfg.ETHOGRAM][idx][cfg.BEHAVIOR_CATEGORY] not in pj[cfg.BEHAVIORAL_CATEGORIES]:
-                    out += "<br><br>" if out else ""
-                    out += (
+                    if out:
+                        out.append("<br><br>")
+                    out.append(
                         f"The behavior <b>{pj[cfg.ETHOGRAM][idx][cfg.BEHAVIOR_CODE]}</b> belongs "
                         f"to the behavioral category <b>{pj[cfg.ETHOGRAM][idx][cfg.BEHAVIOR_CATEGORY]}</b> "
                         "that is no more in behavioral categories list."
@@ -428,10 +443,11 @@ def check_project_integrity(
     for idx in pj[cfg.ETHOGRAM]:
         for k in pj[cfg.ETHOGRAM][idx][cfg.MODIFIERS]:
             for value in pj[cfg.ETHOGRAM][idx][cfg.MODIFIERS][k]["values"]:
-                modifier_code = value.split(" (")[0]
+                modifier_code = value.partition(" (")[0]
                 if modifier_code.strip() != modifier_code:
-                    out += "<br><br>" if out else ""
-                    out += (
+                    if out:
+                        out.append("<br><br>")
+                    out.append(
                         "The following <b>modifier</b> defined in ethogram "
                         "has leading/trailing spaces or special chars: "
                         f"<b>{util.replace_leading_trailing_chars(modifier_code, old_char=' ', new_char='&#9608;')}</b>"
@@ -439,60 +455,73 @@ def check_project_integrity(
 
     # check if all media are available
     if media_file_available:
-        for obs_id in pj[cfg.OBSERVATIONS]:
-            ok, msg = check_if_media_available(pj[cfg.OBSERVATIONS][obs_id], project_file_name)
+        # media files shared by several observations are searched once
+        full_paths: dict = {}
+        for obs_id, observation in pj[cfg.OBSERVATIONS].items():
+            ok, msg = check_if_media_available(observation, project_file_name, full_paths)
             if not ok:
-                out += "<br><br>" if out else ""
-                out += f"Observation: <b>{obs_id}</b><br>{msg}"
+                if out:
+                    out.append("<br><br>")
+                out.append(f"Observation: <b>{obs_id}</b><br>{msg}")
 
-    out_events = ""
-    for obs_id in pj[cfg.OBSERVATIONS]:
+    out_events: list = []
+    for obs_id, observation in pj[cfg.OBSERVATIONS].items():
         # check if timestamp between -2147483647 and 2147483647
-        for event in pj[cfg.OBSERVATIONS][obs_id][cfg.EVENTS]:
-            timestamp = event[cfg.PJ_OBS_FIELDS[pj[cfg.OBSERVATIONS][obs_id][cfg.TYPE]][cfg.TIME]]
+        time_field_idx = cfg.PJ_OBS_FIELDS[observation[cfg.TYPE]][cfg.TIME]
+        for event in observation[cfg.EVENTS]:
+            timestamp = event[time_field_idx]
             if not timestamp.is_nan() and not (-2147483647 <= timestamp <= 2147483647):
-                out_events += f"Observation: <b>{obs_id}</b><br>The timestamp {timestamp} is not between -2147483647 and 2147483647.<br>"
+                out_events.append(
+                    f"Observation: <b>{obs_id}</b><br>The timestamp {timestamp} is not between -2147483647 and 2147483647.<br>"
+                )
 
         # check if media length available
-        if pj[cfg.OBSERVATIONS][obs_id][cfg.TYPE] == cfg.MEDIA:
+        if observation[cfg.TYPE] == cfg.MEDIA:
+            media_length = observation.get(cfg.MEDIA_INFO, {}).get(cfg.LENGTH, {})
             for nplayer in cfg.ALL_PLAYERS:
-                if nplayer in pj[cfg.OBSERVATIONS][obs_id][cfg.FILE]:
-                    for media_file in pj[cfg.OBSERVATIONS][obs_id][cfg.FILE][nplayer]:
-                        try:
-                            pj[cfg.OBSERVATIONS][obs_id][cfg.MEDIA_INFO][cfg.LENGTH][media_file]
-                        except KeyError:
-                            out += "<br><br>" if out else ""
-                            out += f"Observation: <b>{obs_id}</b><br>Length not available for media file <b>{media_file}</b>"
+                if nplayer in observation[cfg.FILE]:
+                    for media_file in observation[cfg.FILE][nplayer]:
+                        if media_file not in media_length:
+                            if out:
+                                out.append("<br><br>")
+                            out.append(f"Observation: <b>{obs_id}</b><br>Length not available for media file <b>{media_file}</b>")
 
-    out += "<br><br>" if out else ""
-    out += out_events
+    if out:
+        out.append("<br><br>")
+    out.extend(out_events)
 
     # check for leading/trailing spaces/special chars in observation id
     for obs_id in pj[cfg.OBSERVATIONS]:
         if obs_id != obs_id.strip():
-            out += "<br><br>" if out else ""
-            out += (
+            if out:
+                out.append("<br><br>")
+            out.append(
                 "The following <b>observation id</b> "
                 "has leading/trailing spaces or special chars: "
                 f"<b>{util.replace_leading_trailing_chars(obs_id, ' ', '&#9608;')}</b>"
             )
 
     # check independent variables present in observations are defined
-    defined_var_label = [pj[cfg.INDEPENDENT_VARIABLES][idx]["label"] for idx in pj.get(cfg.INDEPENDENT_VARIABLES, {})]
+    defined_var_label = {pj[cfg.INDEPENDENT_VARIABLES][idx]["label"] for idx in pj.get(cfg.INDEPENDENT_VARIABLES, {})}
+    # observations with independent variables
+    obs_indep_var: list = [
+        (obs_id, observation[cfg.INDEPENDENT_VARIABLES])
+        for obs_id, observation in pj[cfg.OBSERVATIONS].items()
+        if cfg.INDEPENDENT_VARIABLES in observation
+    ]
     not_defined: dict = {}
-    for obs_id in pj[cfg.OBSERVATIONS]:
-        if cfg.INDEPENDENT_VARIABLES not in pj[cfg.OBSERVATIONS][obs_id]:
-            continue
-        for var_label in pj[cfg.OBSERVATIONS][obs_id][cfg.INDEPENDENT_VARIABLES]:
+    for obs_id, indep_var in obs_indep_var:
+        for var_label in indep_var:
             if var_label not in defined_var_label:
                 if var_label not in not_defined:
                     not_defined[var_label] = [obs_id]
                 else:
                     not_defined[var_label].append(obs_id)
     if not_defined:
-        out += "<br><br>" if out else ""
+        if out:
+            out.append("<br><br>")
         for var_label in not_defined:
-            out += (
+            out.append(
                 f"The independent variable <b>{util.replace_leading_trailing_chars(var_label, ' ', '&#9608;')}</b> "
                 f"present in {len(not_defined[var_label])} observation(s) is not defined.<br>"
             )
@@ -508,20 +537,23 @@ def check_project_integrity(
             if pj[cfg.INDEPENDENT_VARIABLES][idx]["type"] == "value from set"
         ]
     )
+    # allowed values of each "value from set" variable
+    allowed_values: dict = {
+        var_label: frozenset(possible_values.split(",")) for var_label, possible_values in defined_set_var_label.items()
+    }
 
-    out += "<br><br>" if out else ""
-    for obs_id in pj[cfg.OBSERVATIONS]:
-        if cfg.INDEPENDENT_VARIABLES not in pj[cfg.OBSERVATIONS][obs_id]:
-            continue
-        for var_label in pj[cfg.OBSERVATIONS][obs_id][cfg.INDEPENDENT_VARIABLES]:
-            if var_label in defined_set_var_label:
-                if pj[cfg.OBSERVATIONS][obs_id][cfg.INDEPENDENT_VARIABLES][var_label] not in defined_set_var_label[var_label].split(","):
-                    out += (
-                        f"{obs_id}: the <b>{pj[cfg.OBSERVATIONS][obs_id][cfg.INDEPENDENT_VARIABLES][var_label]}</b> value "
+    if out:
+        out.append("<br><br>")
+    for obs_id, indep_var in obs_indep_var:
+        for var_label in indep_var:
+            if var_label in allowed_values:
+                if indep_var[var_label] not in allowed_values[var_label]:
+                    out.append(
+                        f"{obs_id}: the <b>{indep_var[var_label]}</b> value "
                         f" is not allowed for {var_label} (choose between {defined_set_var_label[var_label]})<br>"
                     )
 
-    return out
+    return "".join(out)
 
 
 def create_subtitles(pj: dict, selected_observations: list, parameters: dict, export_dir: str) -> Tuple[bool, str]:
@@ -560,6 +592,52 @@ def create_subtitles(pj: dict, selected_observations: list, parameters: dict, ex
                 "</font>",
             )
 
+    def observation_rows(obs_id: str) -> list:
+        """
+        events of the selected subjects and behaviors for the observation, ordered by start
+
+        Args:
+            obs_id (str): observation id
+
+        Returns:
+            list: rows of aggregated events
+        """
+        if parameters["time"] in (cfg.TIME_EVENTS, cfg.TIME_FULL_OBS):
+            cursor.execute(
+                (
+                    "SELECT subject, behavior, start, stop, type, modifiers FROM aggregated_events "
+                    "WHERE observation = ? "
+                    f"AND subject in ({subjects_placeholders}) "
+                    f"AND behavior in ({behaviors_placeholders}) "
+                    "ORDER BY start"
+                ),
+                [
+                    obs_id,
+                ]
+                + parameters[cfg.SELECTED_SUBJECTS]
+                + parameters[cfg.SELECTED_BEHAVIORS],
+            )
+
+        else:  # arbitrary 'time interval'
+            cursor.execute(
+                (
+                    "SELECT subject, behavior, start, stop, type, modifiers FROM aggregated_events "
+                    "WHERE observation = ? "
+                    "AND (start BETWEEN ? AND ?) "
+                    f"AND subject in ({subjects_placeholders}) "
+                    f"AND behavior in ({behaviors_placeholders}) "
+                    "ORDER BY start"
+                ),
+                [
+                    obs_id,
+                    float(parameters[cfg.START_TIME]),
+                    float(parameters[cfg.END_TIME]),
+                ]
+                + parameters[cfg.SELECTED_SUBJECTS]
+                + parameters[cfg.SELECTED_BEHAVIORS],
+            )
+        return cursor.fetchall()
+
     ok, msg, db_connector = db_functions.load_aggregated_events_in_db(
         pj,
         parameters[cfg.SELECTED_SUBJECTS],
@@ -569,73 +647,19 @@ def create_subtitles(pj: dict, selected_observations: list, parameters: dict, ex
     if not ok:
         return False, msg
 
+    # SRT entry: index, time interval and text
+    srt_entry = "{idx}\n{start} --> {stop}\n{col1}{subject}: {behavior}{modifiers}{col2}\n\n"
+
+    # placeholders for the selected subjects and behaviors
+    subjects_placeholders = ",".join(["?"] * len(parameters[cfg.SELECTED_SUBJECTS]))
+    behaviors_placeholders = ",".join(["?"] * len(parameters[cfg.SELECTED_BEHAVIORS]))
+
     cursor = db_connector.cursor()
     flag_ok = True
     msg = ""
     mem_command = ""
     for obs_id in selected_observations:
         if pj[cfg.OBSERVATIONS][obs_id][cfg.TYPE] == cfg.LIVE:
-            out = ""
-            if parameters["time"] in (cfg.TIME_EVENTS, cfg.TIME_FULL_OBS):
-                cursor.execute(
-                    (
-                        "SELECT subject, behavior, start, stop, type, modifiers FROM aggregated_events "
-                        "WHERE observation = ? "
-                        "AND subject in ({}) "
-                        "AND behavior in ({}) "
-                        "ORDER BY start"
-                    ).format(
-                        ",".join(["?"] * len(parameters[cfg.SELECTED_SUBJECTS])),
-                        ",".join(["?"] * len(parameters[cfg.SELECTED_BEHAVIORS])),
-                    ),
-                    [
-                        obs_id,
-                    ]
-                    + parameters[cfg.SELECTED_SUBJECTS]
-                    + parameters[cfg.SELECTED_BEHAVIORS],
-                )
-
-            else:  # arbitrary 'time interval'
-                cursor.execute(
-                    (
-                        "SELECT subject, behavior, start, stop, type, modifiers FROM aggregated_events "
-                        "WHERE observation = ? "
-                        "AND (start BETWEEN ? AND ?) "
-                        "AND subject in ({}) "
-                        "AND behavior in ({}) "
-                        "ORDER BY start"
-                    ).format(
-                        ",".join(["?"] * len(parameters[cfg.SELECTED_SUBJECTS])),
-                        ",".join(["?"] * len(parameters[cfg.SELECTED_BEHAVIORS])),
-                    ),
-                    [
-                        obs_id,
-                        float(parameters[cfg.START_TIME]),
-                        float(parameters[cfg.END_TIME]),
-                    ]
-                    + parameters[cfg.SELECTED_SUBJECTS]
-                    + parameters[cfg.SELECTED_BEHAVIORS],
-                )
-
-            for idx, row in enumerate(cursor.fetchall()):
-                col1, col2 = subject_color(row["subject"])
-                if parameters["include modifiers"]:
-                    modifiers_str = f"\n{row['modifiers'].replace('|', ', ')}"
-                else:
-                    modifiers_str = ""
-                out += ("{idx}\n" "{start} --> {stop}\n" "{col1}{subject}: {behavior}" "{modifiers}" "{col2}\n\n").format(
-                    idx=idx + 1,
-                    start=util.seconds2time(row["start"]).replace(".", ","),
-                    stop=util.seconds2time(row["stop"] if row["type"] == cfg.STATE else row["stop"] + cfg.POINT_EVENT_ST_DURATION).replace(
-                        ".", ","
-                    ),
-                    col1=col1,
-                    col2=col2,
-                    subject=row["subject"],
-                    behavior=row["behavior"],
-                    modifiers=modifiers_str,
-                )
-
             file_name = pl.Path(export_dir) / pl.Path(util.safeFileName(obs_id)).with_suffix(".srt")
 
             if mem_command not in (cfg.OVERWRITE_ALL, cfg.SKIP_ALL) and file_name.is_file():
@@ -655,14 +679,40 @@ def create_subtitles(pj: dict, selected_observations: list, parameters: dict, ex
                 if mem_command in (cfg.SKIP, cfg.SKIP_ALL):
                     continue
 
+            obs_rows = observation_rows(obs_id)
+
+            # subtitles are written while the rows are read
             try:
                 with file_name.open("w", encoding="utf-8") as f_out:
-                    f_out.write(out)
+                    for idx, row in enumerate(obs_rows):
+                        col1, col2 = subject_color(row["subject"])
+                        if parameters["include modifiers"]:
+                            modifiers_str = f"\n{row['modifiers'].replace('|', ', ')}"
+                        else:
+                            modifiers_str = ""
+                        f_out.write(
+                            srt_entry.format(
+                                idx=idx + 1,
+                                start=util.seconds2srt_time(row["start"]),
+                                stop=util.seconds2srt_time(
+                                    row["stop"] if row["type"] == cfg.STATE else row["stop"] + cfg.POINT_EVENT_ST_DURATION
+                                ),
+                                col1=col1,
+                                col2=col2,
+                                subject=row["subject"],
+                                behavior=row["behavior"],
+                                modifiers=modifiers_str,
+                            )
+                        )
             except Exception:
                 flag_ok = False
                 msg += f"observation: {obs_id}\ngave the following error:\n{str(sys.exc_info()[1])}\n"
 
         if pj[cfg.OBSERVATIONS][obs_id][cfg.TYPE] == cfg.MEDIA:
+            # the events of the observation are split by media file below
+            obs_rows = observation_rows(obs_id)
+            obs_starts = [row["start"] for row in obs_rows]
+
             for nplayer in cfg.ALL_PLAYERS:
                 if not pj[cfg.OBSERVATIONS][obs_id][cfg.FILE][nplayer]:
                     continue
@@ -675,74 +725,6 @@ def create_subtitles(pj: dict, selected_observations: list, parameters: dict, ex
                             False,
                             f"The length for media file {media_file} is not available",
                         )
-                    out = ""
-
-                    if parameters["time"] in (cfg.TIME_EVENTS, cfg.TIME_FULL_OBS):
-                        cursor.execute(
-                            (
-                                "SELECT subject, behavior, start, stop, type, modifiers FROM aggregated_events "
-                                "WHERE observation = ? "
-                                "AND (start BETWEEN ? AND ?) "
-                                "AND subject in ({}) "
-                                "AND behavior in ({}) "
-                                "ORDER BY start"
-                            ).format(
-                                ",".join(["?"] * len(parameters[cfg.SELECTED_SUBJECTS])),
-                                ",".join(["?"] * len(parameters[cfg.SELECTED_BEHAVIORS])),
-                            ),
-                            [
-                                obs_id,
-                                init,
-                                end,
-                            ]
-                            + parameters[cfg.SELECTED_SUBJECTS]
-                            + parameters[cfg.SELECTED_BEHAVIORS],
-                        )
-
-                    else:  # arbitrary 'time interval'
-                        cursor.execute(
-                            (
-                                "SELECT subject, behavior, type, start, stop, modifiers FROM aggregated_events "
-                                "WHERE observation = ? "
-                                "AND (start BETWEEN ? AND ?) "
-                                "AND (start BETWEEN ? AND ?) "
-                                "AND subject in ({}) "
-                                "AND behavior in ({}) "
-                                "ORDER BY start"
-                            ).format(
-                                ",".join(["?"] * len(parameters[cfg.SELECTED_SUBJECTS])),
-                                ",".join(["?"] * len(parameters[cfg.SELECTED_BEHAVIORS])),
-                            ),
-                            [
-                                obs_id,
-                                init,
-                                end,
-                                float(parameters[cfg.START_TIME]),
-                                float(parameters[cfg.END_TIME]),
-                            ]
-                            + parameters[cfg.SELECTED_SUBJECTS]
-                            + parameters[cfg.SELECTED_BEHAVIORS],
-                        )
-
-                    for idx, row in enumerate(cursor.fetchall()):
-                        col1, col2 = subject_color(row["subject"])
-                        if parameters["include modifiers"]:
-                            modifiers_str = f"\n{row['modifiers'].replace('|', ', ')}"
-                        else:
-                            modifiers_str = ""
-
-                        out += ("{idx}\n" "{start} --> {stop}\n" "{col1}{subject}: {behavior}" "{modifiers}" "{col2}\n\n").format(
-                            idx=idx + 1,
-                            start=util.seconds2time(row["start"] - init).replace(".", ","),
-                            stop=util.seconds2time(
-                                (row["stop"] if row["type"] == cfg.STATE else row["stop"] + cfg.POINT_EVENT_ST_DURATION) - init
-                            ).replace(".", ","),
-                            col1=col1,
-                            col2=col2,
-                            subject=row["subject"],
-                            behavior=row["behavior"],
-                            modifiers=modifiers_str,
-                        )
                     file_name = pl.Path(export_dir) / pl.Path(pl.Path(media_file).stem).with_suffix(".srt")
 
                     if mem_command not in (cfg.OVERWRITE_ALL, cfg.SKIP_ALL) and file_name.is_file():
@@ -761,9 +743,32 @@ def create_subtitles(pj: dict, selected_observations: list, parameters: dict, ex
                             return False, ""
                         if mem_command in (cfg.SKIP, cfg.SKIP_ALL):
                             continue
+                    # events starting in the media file
+                    media_rows = obs_rows[bisect.bisect_left(obs_starts, init) : bisect.bisect_right(obs_starts, end)]
+
+                    # subtitles are written while the rows are read
                     try:
                         with file_name.open("w", encoding="utf-8") as f_out:
-                            f_out.write(out)
+                            for idx, row in enumerate(media_rows):
+                                col1, col2 = subject_color(row["subject"])
+                                if parameters["include modifiers"]:
+                                    modifiers_str = f"\n{row['modifiers'].replace('|', ', ')}"
+                                else:
+                                    modifiers_str = ""
+                                f_out.write(
+                                    srt_entry.format(
+                                        idx=idx + 1,
+                                        start=util.seconds2srt_time(row["start"] - init),
+                                        stop=util.seconds2srt_time(
+                                            (row["stop"] if row["type"] == cfg.STATE else row["stop"] + cfg.POINT_EVENT_ST_DURATION) - init
+                                        ),
+                                        col1=col1,
+                                        col2=col2,
+                                        subject=row["subject"],
+                                        behavior=row["behavior"],
+                                        modifiers=modifiers_str,
+                                    )
+                                )
                     except Exception:
                         flag_ok = False
                         msg += f"observation: {obs_id}\ngave the following error:\n{sys.exc_info()[1]}\n"
@@ -787,36 +792,35 @@ def export_observations_list(pj: dict, selected_observations: list, file_name: s
         bool: True of OK else False
     """
 
-    data = tablib.Dataset()
-    data.headers = [
+    indep_var_header = []
+    if cfg.INDEPENDENT_VARIABLES in pj:
+        for idx in util.sorted_keys(pj[cfg.INDEPENDENT_VARIABLES]):
+            indep_var_header.append(pj[cfg.INDEPENDENT_VARIABLES][idx]["label"])
+
+    headers = [
         "Observation id",
         "Date",
         "Description",
         "Subjects",
         "Media files/Live observation",
-    ]
-
-    indep_var_header = []
-    if cfg.INDEPENDENT_VARIABLES in pj:
-        for idx in util.sorted_keys(pj[cfg.INDEPENDENT_VARIABLES]):
-            indep_var_header.append(pj[cfg.INDEPENDENT_VARIABLES][idx]["label"])
-    data.headers.extend(indep_var_header)
+    ] + indep_var_header
 
+    rows = []
     for obs_id in selected_observations:
-        subjects_list = sorted(list(set([x[cfg.EVENT_SUBJECT_FIELD_IDX] for x in pj[cfg.OBSERVATIONS][obs_id][cfg.EVENTS]])))
-        if "" in subjects_list:
-            subjects_list = [cfg.NO_FOCAL_SUBJECT] + subjects_list
-            subjects_list.remove("")
+        subjects_set = {x[cfg.EVENT_SUBJECT_FIELD_IDX] for x in pj[cfg.OBSERVATIONS][obs_id][cfg.EVENTS]}
+        if "" in subjects_set:
+            subjects_set.discard("")
+            subjects_list = [cfg.NO_FOCAL_SUBJECT] + sorted(subjects_set)
+        else:
+            subjects_list = sorted(subjects_set)
         subjects = ", ".join(subjects_list)
 
         if pj[cfg.OBSERVATIONS][obs_id][cfg.TYPE] == cfg.LIVE:
             media_files = ["Live observation"]
         elif pj[cfg.OBSERVATIONS][obs_id][cfg.TYPE] == cfg.MEDIA:
-            media_files = []
-            if pj[cfg.OBSERVATIONS][obs_id][cfg.FILE]:
-                for player in sorted(pj[cfg.OBSERVATIONS][obs_id][cfg.FILE].keys()):
-                    for media in pj[cfg.OBSERVATIONS][obs_id][cfg.FILE][player]:
-                        media_files.append(f"#{player}: {media}")
+            # players are listed in the ALL_PLAYERS order
+            files = pj[cfg.OBSERVATIONS][obs_id][cfg.FILE]
+            media_files = [f"#{player}: {media}" for player in cfg.ALL_PLAYERS if player in files for media in files[player]]
 
         # independent variables
         indep_var = []
@@ -827,17 +831,19 @@ def export_observations_list(pj: dict, selected_observations: list, file_name: s
                 else:
                     indep_var.append("")
 
-        data.append(
-            [
+        rows.append(
+            (
                 obs_id,
                 pj[cfg.OBSERVATIONS][obs_id]["date"],
                 pj[cfg.OBSERVATIONS][obs_id]["description"],
                 subjects,
                 ", ".join(media_files),
-            ]
-            + indep_var
+                *indep_var,
+            )
         )
 
+    data = tablib.Dataset(*rows, headers=headers)
+
     if output_format in (cfg.TSV_EXT, cfg.CSV_EXT, cfg.HTML_EXT):
         try:
             with open(file_name, "wb") as f:
@@ -866,29 +872,39 @@ def set_media_paths_relative_to_project_dir(pj: dict, project_file_name: str) ->
         bool: True if project changed else False
     """
 
-    # chek if media and images dir are relative to project dir
+    project_dir = pl.Path(project_file_name).parent
+
+    # check if media and images dir are relative to project dir and collect the new paths
+    # the project is modified only if all paths are relative to project dir
+    new_dir_lists: list = []  # (obs_id, new list of images directories)
+    new_media_paths: list = []  # (obs_id, player, index, old path, new path)
     for obs_id in pj[cfg.OBSERVATIONS]:
         if pj[cfg.OBSERVATIONS][obs_id][cfg.TYPE] == cfg.IMAGES:
+            new_dir_list = []
             for img_dir in pj[cfg.OBSERVATIONS][obs_id][cfg.DIRECTORIES_LIST]:
+                img_dir_path = pl.Path(img_dir)
                 try:
-                    pl.Path(img_dir).relative_to(pl.Path(project_file_name).parent)
+                    new_dir_list.append(str(img_dir_path.relative_to(project_dir)))
                 except ValueError:
-                    if pl.Path(img_dir).is_absolute() or not (pl.Path(project_file_name).parent / pl.Path(img_dir)).is_dir():
+                    if img_dir_path.is_absolute() or not (project_dir / img_dir_path).is_dir():
                         QMessageBox.critical(
                             None,
                             cfg.programName,
                             f"Observation <b>{obs_id}</b>:<br>the path of <b>{img_dir}</b> is not relative to <b>{project_file_name}</b>.",
                         )
                         return False
+                    new_dir_list.append(img_dir)
+            new_dir_lists.append((obs_id, new_dir_list))
 
         if pj[cfg.OBSERVATIONS][obs_id][cfg.TYPE] == cfg.MEDIA:
             for n_player in cfg.ALL_PLAYERS:
                 if n_player in pj[cfg.OBSERVATIONS][obs_id][cfg.FILE]:
                     for idx, media_file in enumerate(pj[cfg.OBSERVATIONS][obs_id][cfg.FILE][n_player]):
+                        media_path = pl.Path(media_file)
                         try:
-                            pl.Path(media_file).relative_to(pl.Path(project_file_name).parent)
+                            p = str(media_path.relative_to(project_dir))
                         except ValueError:
-                            if pl.Path(media_file).is_absolute() or not (pl.Path(project_file_name).parent / pl.Path(media_file)).is_file():
+                            if media_path.is_absolute() or not (project_dir / media_path).is_file():
                                 QMessageBox.critical(
                                     None,
                                     cfg.programName,
@@ -898,55 +914,35 @@ def set_media_paths_relative_to_project_dir(pj: dict, project_file_name: str) ->
                                     ),
                                 )
                                 return False
+                            p = media_file
+                        if p != media_file:
+                            new_media_paths.append((obs_id, n_player, idx, media_file, p))
 
     # set media path and image dir relative to project dir
     flag_changed = False
-    for obs_id in pj[cfg.OBSERVATIONS]:
-        if pj[cfg.OBSERVATIONS][obs_id][cfg.TYPE] == cfg.IMAGES:
-            new_dir_list = []
-            for img_dir in pj[cfg.OBSERVATIONS][obs_id][cfg.DIRECTORIES_LIST]:
-                try:
-                    new_dir_list.append(str(pl.Path(img_dir).relative_to(pl.Path(project_file_name).parent)))
-                except ValueError:
-                    if not pl.Path(img_dir).is_absolute() and (pl.Path(project_file_name).parent / pl.Path(img_dir)).is_dir():
-                        new_dir_list.append(img_dir)
-
-            if pj[cfg.OBSERVATIONS][obs_id][cfg.DIRECTORIES_LIST] != new_dir_list:
-                flag_changed = True
-            pj[cfg.OBSERVATIONS][obs_id][cfg.DIRECTORIES_LIST] = new_dir_list
-
-        if pj[cfg.OBSERVATIONS][obs_id][cfg.TYPE] == cfg.MEDIA:
-            for n_player in cfg.ALL_PLAYERS:
-                if n_player in pj[cfg.OBSERVATIONS][obs_id][cfg.FILE]:
-                    for idx, media_file in enumerate(pj[cfg.OBSERVATIONS][obs_id][cfg.FILE][n_player]):
-                        try:
-                            p = str(pl.Path(media_file).relative_to(pl.Path(project_file_name).parent))
-                        except ValueError:
-                            if (
-                                not pl.Path(media_file).is_absolute()
-                                and (pl.Path(project_file_name).parent / pl.Path(media_file)).is_file()
-                            ):
-                                p = media_file
-                        if p != media_file:
-                            flag_changed = True
-                            pj[cfg.OBSERVATIONS][obs_id][cfg.FILE][n_player][idx] = p
-                            if cfg.MEDIA_INFO in pj[cfg.OBSERVATIONS][obs_id]:
-                                for info in [
-                                    cfg.LENGTH,
-                                    cfg.HAS_AUDIO,
-                                    cfg.HAS_VIDEO,
-                                    cfg.FPS,
-                                ]:
-                                    if (
-                                        info in pj[cfg.OBSERVATIONS][obs_id][cfg.MEDIA_INFO]
-                                        and media_file in pj[cfg.OBSERVATIONS][obs_id][cfg.MEDIA_INFO][info]
-                                    ):
-                                        # add new file path
-                                        pj[cfg.OBSERVATIONS][obs_id][cfg.MEDIA_INFO][info][p] = pj[cfg.OBSERVATIONS][obs_id][
-                                            cfg.MEDIA_INFO
-                                        ][info][media_file]
-                                        # remove old path
-                                        del pj[cfg.OBSERVATIONS][obs_id][cfg.MEDIA_INFO][info][media_file]
+    for obs_id, new_dir_list in new_dir_lists:
+        if pj[cfg.OBSERVATIONS][obs_id][cfg.DIRECTORIES_LIST] != new_dir_list:
+            flag_changed = True
+        pj[cfg.OBSERVATIONS][obs_id][cfg.DIRECTORIES_LIST] = new_dir_list
+
+    for obs_id, n_player, idx, media_file, p in new_media_paths:
+        flag_changed = True
+        pj[cfg.OBSERVATIONS][obs_id][cfg.FILE][n_player][idx] = p
+        if cfg.MEDIA_INFO in pj[cfg.OBSERVATIONS][obs_id]:
+            for info in [
+                cfg.LENGTH,
+                cfg.HAS_AUDIO,
+                cfg.HAS_VIDEO,
+                cfg.FPS,
+            ]:
+                if (
+                    info in pj[cfg.OBSERVATIONS][obs_id][cfg.MEDIA_INFO]
+                    and media_file in pj[cfg.OBSERVATIONS][obs_id][cfg.MEDIA_INFO][info]
+                ):
+                    # add new file path
+                    pj[cfg.OBSERVATIONS][obs_id][cfg.MEDIA_INFO][info][p] = pj[cfg.OBSERVATIONS][obs_id][cfg.MEDIA_INFO][info][media_file]
+                    # remove old path
+                    del pj[cfg.OBSERVATIONS][obs_id][cfg.MEDIA_INFO][info][media_file]
     return flag_changed
 
 
@@ -961,18 +957,20 @@ def set_data_paths_relative_to_project_dir(pj: dict, project_file_name: str) ->
     Returns:
         bool: True if project changed else False
     """
-    # chek if data paths are relative to project dir
+    project_dir = pl.Path(project_file_name).parent
+
+    # chek if data paths are relative to project dir and collect the new paths of media observations
+    # the project is modified only if all paths are relative to project dir
+    new_data_paths: list = []  # (obs_id, index, new path)
     for obs_id in pj[cfg.OBSERVATIONS]:
-        for _, v in pj[cfg.OBSERVATIONS][obs_id].get(cfg.PLOT_DATA, {}).items():
+        for idx, v in pj[cfg.OBSERVATIONS][obs_id].get(cfg.PLOT_DATA, {}).items():
             if cfg.FILE_PATH in v:
+                data_path = pl.Path(v[cfg.FILE_PATH])
                 try:
-                    pl.Path(v[cfg.FILE_PATH]).relative_to(pl.Path(project_file_name).parent)
+                    p = str(data_path.relative_to(project_dir))
                 except ValueError:
                     # check if file is in project dir
-                    if (
-                        pl.Path(v[cfg.FILE_PATH]).is_absolute()
-                        or not (pl.Path(project_file_name).parent / pl.Path(v[cfg.FILE_PATH])).is_file()
-                    ):
+                    if data_path.is_absolute() or not (project_dir / data_path).is_file():
                         QMessageBox.critical(
                             None,
                             cfg.programName,
@@ -983,28 +981,15 @@ def set_data_paths_relative_to_project_dir(pj: dict, project_file_name: str) ->
                             ),
                         )
                         return False
+                    p = v[cfg.FILE_PATH]
 
-    flag_changed = False
-    for obs_id in pj[cfg.OBSERVATIONS]:
-        if pj[cfg.OBSERVATIONS][obs_id][cfg.TYPE] != cfg.MEDIA:
-            continue
-        for idx, v in pj[cfg.OBSERVATIONS][obs_id].get(cfg.PLOT_DATA, {}).items():
-            if cfg.FILE_PATH in v:
-                try:
-                    p = str(pl.Path(v[cfg.FILE_PATH]).relative_to(pl.Path(project_file_name).parent))
-                except ValueError:
-                    # check if file is in project dir
-                    if (
-                        not pl.Path(v[cfg.FILE_PATH]).is_absolute()
-                        and (pl.Path(project_file_name).parent / pl.Path(v[cfg.FILE_PATH])).is_file()
-                    ):
-                        p = v[cfg.FILE_PATH]
+                if p != v[cfg.FILE_PATH] and pj[cfg.OBSERVATIONS][obs_id][cfg.TYPE] == cfg.MEDIA:
+                    new_data_paths.append((obs_id, idx, p))
 
-                if p != v[cfg.FILE_PATH]:
-                    pj[cfg.OBSERVATIONS][obs_id][cfg.PLOT_DATA][idx][cfg.FILE_PATH] = p
-                    flag_changed = True
+    for obs_id, idx, p in new_data_paths:
+        pj[cfg.OBSERVATIONS][obs_id][cfg.PLOT_DATA][idx][cfg.FILE_PATH] = p
 
-    return flag_changed
+    return bool(new_data_paths)
 
 
 def remove_data_files_path(pj: dict) -> None:
@@ -1041,22 +1026,41 @@ def remove_media_files_path(pj: dict, project_file_name: str) -> bool:
         None
     """
 
-    file_not_found = []
+    # files and directories of the project directory listed at once
+    # (the media files and images directories will be searched there after removing their path)
+    try:
+        with os.scandir(pl.Path(project_file_name).parent) as entries:
+            project_dir_content = {entry.name for entry in entries if entry.is_file() or entry.is_dir()}
+    except OSError:
+        project_dir_content = set()
+
+    def not_found(path: str) -> bool:
+        name = pl.Path(path).name
+        return name not in project_dir_content and full_path(name, project_file_name) == ""
+
+    file_not_found: set = set()
+    # media files and images directories shared by several observations are searched once
+    searched_paths: set = set()
     # check if media and images dir
     for obs_id in pj[cfg.OBSERVATIONS]:
         if pj[cfg.OBSERVATIONS][obs_id][cfg.TYPE] == cfg.IMAGES:
             for img_dir in pj[cfg.OBSERVATIONS][obs_id][cfg.DIRECTORIES_LIST]:
-                if full_path(pl.Path(img_dir).name, project_file_name) == "":
-                    file_not_found.append(img_dir)
+                if img_dir in searched_paths:
+                    continue
+                searched_paths.add(img_dir)
+                if not_found(img_dir):
+                    file_not_found.add(img_dir)
 
         if pj[cfg.OBSERVATIONS][obs_id][cfg.TYPE] == cfg.MEDIA:
             for n_player in cfg.ALL_PLAYERS:
                 if n_player in pj[cfg.OBSERVATIONS][obs_id][cfg.FILE]:
-                    for idx, media_file in enumerate(pj[cfg.OBSERVATIONS][obs_id][cfg.FILE][n_player]):
-                        if full_path(pl.Path(media_file).name, project_file_name) == "":
-                            file_not_found.append(media_file)
+                    for media_file in pj[cfg.OBSERVATIONS][obs_id][cfg.FILE][n_player]:
+                        if media_file in searched_paths:
+                            continue
+                        searched_paths.add(media_file)
+                        if not_found(media_file):
+                            file_not_found.add(media_file)
 
-    file_not_found = set(file_not_found)
     if file_not_found:
         if (
             dialog.MessageDialog(
@@ -1077,9 +1081,10 @@ def remove_media_files_path(pj: dict, project_file_name: str) -> bool:
         if pj[cfg.OBSERVATIONS][obs_id][cfg.TYPE] == cfg.IMAGES:
             new_img_dir_list = []
             for img_dir in pj[cfg.OBSERVATIONS][obs_id][cfg.DIRECTORIES_LIST]:
-                if img_dir != pl.Path(img_dir).name:
+                img_dir_name = pl.Path(img_dir).name
+                if img_dir != img_dir_name:
                     flag_changed = True
-                new_img_dir_list.append(str(pl.Path(img_dir).name))
+                new_img_dir_list.append(img_dir_name)
             pj[cfg.OBSERVATIONS][obs_id][cfg.DIRECTORIES_LIST] = new_img_dir_list
 
         if pj[cfg.OBSERVATIONS][obs_id][cfg.TYPE] == cfg.MEDIA:
@@ -1129,9 +1134,9 @@ def full_path(path: str, project_file_name: str) -> str:
         return str(source_path)
     else:
         # check relative path (to project path)
-        project_path = pl.Path(project_file_name)
-        if (project_path.parent / source_path).exists():
-            return str(project_path.parent / source_path)
+        relative_path = pl.Path(project_file_name).parent / source_path
+        if relative_path.exists():
+            return str(relative_path)
         else:
             return ""
 
@@ -1178,31 +1183,20 @@ def events_start_stop(ethogram: dict, events: list, obs_type: str) -> List[tuple
         list: list of events with type (POINT or STATE)
     """
 
-    state_events_list = util.state_behavior_codes(ethogram)
+    state_events_list = frozenset(util.state_behavior_codes(ethogram))
 
+    # number of previous occurrences of each (code, subject, modifier) state event
+    state_events_count: dict = {}
     events_flagged: list = []
-    for idx, event in enumerate(events):
+    for event in events:
         _, subject, code, modifier = event[: cfg.EVENT_MODIFIER_FIELD_IDX + 1]
 
         # check if code is state
         if code in state_events_list:
-            # how many code before with same subject?
-            if (
-                len(
-                    [
-                        x[cfg.EVENT_BEHAVIOR_FIELD_IDX]
-                        for idx1, x in enumerate(events)
-                        if x[cfg.EVENT_BEHAVIOR_FIELD_IDX] == code
-                        and idx1 < idx
-                        and x[cfg.EVENT_SUBJECT_FIELD_IDX] == subject
-                        and x[cfg.EVENT_MODIFIER_FIELD_IDX] == modifier
-                    ]
-                )
-                % 2
-            ):  # test if odd
-                flag = cfg.STOP
-            else:
-                flag = cfg.START
+            # how many code before with same subject and modifier?
+            n_before = state_events_count.get((code, subject, modifier), 0)
+            state_events_count[(code, subject, modifier)] = n_before + 1
+            flag = cfg.STOP if n_before % 2 else cfg.START
         else:
             flag = cfg.POINT
 
@@ -1271,7 +1265,9 @@ def open_project_json(projectFileName: str) -> tuple:
             file_in = gzip.open(projectFileName, mode="rt", encoding="utf-8")
         else:
             file_in = open(projectFileName, "r")
-        file_content = file_in.read()
+        # the file is closed before parsing
+        with file_in:
+            file_content = file_in.read()
     except PermissionError:
         return (
             projectFileName,
@@ -1304,6 +1300,9 @@ def open_project_json(projectFileName: str) -> tuple:
             msg,
         )
 
+    # the file content is not kept in memory with the parsed project
+    del file_content
+
     # transform time to decimal
     pj = util.convert_time_to_decimal(pj)
 
@@ -1515,6 +1514,52 @@ def event_type(code: str, ethogram: dict) -> str:
     return None
 
 
+def event_type_by_code(ethogram: dict) -> dict:
+    """
+    returns the type of event of all behavior codes
+    to be used instead of event_type when many codes must be checked
+
+    Args:
+        ethogram (dict): ethogram of project
+
+    Returns:
+        dict: code: "STATE EVENT" or "POINT EVENT" (as returned by event_type)
+    """
+
+    event_types: dict = {}
+    for idx in ethogram:
+        event_types.setdefault(ethogram[idx][cfg.BEHAVIOR_CODE], ethogram[idx][cfg.TYPE].upper())
+    return event_types
+
+
+def unpaired_state_events(ethogram: dict, events: list) -> list:
+    """
+    find the unpaired state events in a list of events
+
+    Args:
+        ethogram (dict): ethogram dictionary
+        events (list): list of events
+
+    Returns:
+        list: (subject, behavior, modifiers) of the unpaired state events sorted by subject and behavior
+    """
+
+    state_behaviors = frozenset(util.state_behavior_codes(ethogram))
+
+    # open state events toggled in a single pass: (subject, behavior, modifiers) of the unpaired events
+    open_states: dict = {}
+    for event in events:
+        if event[cfg.EVENT_BEHAVIOR_FIELD_IDX] in state_behaviors:
+            key = (event[cfg.EVENT_SUBJECT_FIELD_IDX], event[cfg.EVENT_BEHAVIOR_FIELD_IDX], event[cfg.EVENT_MODIFIER_FIELD_IDX])
+            if key in open_states:
+                del open_states[key]
+            else:
+                open_states[key] = None
+
+    # the sort is stable: the modifiers of a (subject, behavior) keep the order in which they were opened
+    return sorted(open_states, key=lambda key: key[:2])
+
+
 def fix_unpaired_state_events(ethogram: dict, observation: dict, fix_at_time: dec) -> list:
     """
     fix unpaired state events in observation
@@ -1529,47 +1574,19 @@ def fix_unpaired_state_events(ethogram: dict, observation: dict, fix_at_time: de
     """
 
     closing_events_to_add: list = []
-    subjects: list = [event[cfg.EVENT_SUBJECT_FIELD_IDX] for event in observation[cfg.EVENTS]]
-    ethogram_behaviors: dict = {ethogram[idx][cfg.BEHAVIOR_CODE] for idx in ethogram}
-
-    for subject in sorted(set(subjects)):
-        behaviors: list = [
-            event[cfg.EVENT_BEHAVIOR_FIELD_IDX] for event in observation[cfg.EVENTS] if event[cfg.EVENT_SUBJECT_FIELD_IDX] == subject
-        ]
-
-        for behavior in sorted(set(behaviors)):
-            if (behavior in ethogram_behaviors) and (cfg.STATE in event_type(behavior, ethogram).upper()):
-                lst, memTime = [], {}
-                for event in [
-                    event
-                    for event in observation[cfg.EVENTS]
-                    if event[cfg.EVENT_BEHAVIOR_FIELD_IDX] == behavior and event[cfg.EVENT_SUBJECT_FIELD_IDX] == subject
-                ]:
-                    behav_modif = [
-                        event[cfg.EVENT_BEHAVIOR_FIELD_IDX],
-                        event[cfg.EVENT_MODIFIER_FIELD_IDX],
-                    ]
-
-                    if behav_modif in lst:
-                        lst.remove(behav_modif)
-                        del memTime[str(behav_modif)]
-                    else:
-                        lst.append(behav_modif)
-                        memTime[str(behav_modif)] = event[cfg.EVENT_TIME_FIELD_IDX]
-
-                for event in lst:
-                    last_event_time = max([fix_at_time] + [x[0] for x in closing_events_to_add])
-
-                    closing_events_to_add.append(
-                        [
-                            last_event_time + dec("0.001"),
-                            subject,
-                            behavior,
-                            event[1],  # modifiers
-                            "Event automatically added by the fix unpaired state events function",
-                            cfg.NA,  # frame index
-                        ]
-                    )
+    last_event_time = fix_at_time
+    for subject, behavior, modifiers in unpaired_state_events(ethogram, observation[cfg.EVENTS]):
+        last_event_time += dec("0.001")
+        closing_events_to_add.append(
+            [
+                last_event_time,
+                subject,
+                behavior,
+                modifiers,
+                "Event automatically added by the fix unpaired state events function",
+                cfg.NA,  # frame index
+            ]
+        )
 
     return closing_events_to_add
 
@@ -1587,49 +1604,17 @@ def fix_unpaired_state_events2(ethogram: dict, events: list, fix_at_time: dec) -
         list: list of events with state events fixed
     """
 
-    closing_events_to_add: list = []
-    subjects: list = [event[cfg.EVENT_SUBJECT_FIELD_IDX] for event in events]
-    ethogram_behaviors: dict = {ethogram[idx][cfg.BEHAVIOR_CODE] for idx in ethogram}
-
-    for subject in sorted(set(subjects)):
-        behaviors: list = [event[cfg.EVENT_BEHAVIOR_FIELD_IDX] for event in events if event[cfg.EVENT_SUBJECT_FIELD_IDX] == subject]
-
-        for behavior in sorted(set(behaviors)):
-            if (behavior in ethogram_behaviors) and (cfg.STATE in event_type(behavior, ethogram).upper()):
-                lst, memTime = [], {}
-                for event in [
-                    event
-                    for event in events
-                    if event[cfg.EVENT_BEHAVIOR_FIELD_IDX] == behavior and event[cfg.EVENT_SUBJECT_FIELD_IDX] == subject
-                ]:
-                    behav_modif = [
-                        event[cfg.EVENT_BEHAVIOR_FIELD_IDX],
-                        event[cfg.EVENT_MODIFIER_FIELD_IDX],
-                    ]
-
-                    if behav_modif in lst:
-                        lst.remove(behav_modif)
-                        del memTime[str(behav_modif)]
-                    else:
-                        lst.append(behav_modif)
-                        memTime[str(behav_modif)] = event[cfg.EVENT_TIME_FIELD_IDX]
-
-                for event in lst:
-                    last_event_time = max([fix_at_time] + [x[0] for x in closing_events_to_add])
-
-                    closing_events_to_add.append(
-                        [
-                            # last_event_time + dec("0.001"),
-                            last_event_time,
-                            subject,
-                            behavior,
-                            event[1],  # modifiers
-                            "Event automatically added by the fix unpaired state events function",
-                            cfg.NA,  # frame index
-                        ]
-                    )
-
-    return closing_events_to_add
+    return [
+        [
+            fix_at_time,
+            subject,
+            behavior,
+            modifiers,
+            "Event automatically added by the fix unpaired state events function",
+            cfg.NA,  # frame index
+        ]
+        for subject, behavior, modifiers in unpaired_state_events(ethogram, events)
+    ]
 
 
 def has_audio(observation: dict, media_file_path: str) -> bool:
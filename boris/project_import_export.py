@@ -62,24 +62,24 @@ def export_ethogram(self) -> None:
     """
     export ethogram in various format
     """
-    extended_file_formats: list = [
-        "BORIS project file (*.boris)",
-        "Tab Separated Values (*.tsv)",
-        "Comma Separated Values (*.csv)",
-        "Open Document Spreadsheet ODS (*.ods)",
-        "Microsoft Excel Spreadsheet XLSX (*.xlsx)",
-        "Legacy Microsoft Excel Spreadsheet XLS (*.xls)",
-        "HTML (*.html)",
-    ]
-    file_formats: list = ["boris", cfg.TSV_EXT, cfg.CSV_EXT, cfg.ODS_EXT, cfg.XLSX_EXT, cfg.XLS_EXT, cfg.HTML_EXT]
+    # file dialog filter: file extension
+    file_formats: dict = {
+        "BORIS project file (*.boris)": "boris",
+        "Tab Separated Values (*.tsv)": cfg.TSV_EXT,
+        "Comma Separated Values (*.csv)": cfg.CSV_EXT,
+        "Open Document Spreadsheet ODS (*.ods)": cfg.ODS_EXT,
+        "Microsoft Excel Spreadsheet XLSX (*.xlsx)": cfg.XLSX_EXT,
+        "Legacy Microsoft Excel Spreadsheet XLS (*.xls)": cfg.XLS_EXT,
+        "HTML (*.html)": cfg.HTML_EXT,
+    }
 
     filediag_func = QFileDialog().getSaveFileName
 
-    file_name, filter_ = filediag_func(self, "Export ethogram", "", ";;".join(extended_file_formats))
+    file_name, filter_ = filediag_func(self, "Export ethogram", "", ";;".join(file_formats))
     if not file_name:
         return
 
-    output_format: str = file_formats[extended_file_formats.index(filter_)]
+    output_format: str = file_formats[filter_]
     if pl.Path(file_name).suffix != "." + output_format:
         file_name = str(pl.Path(file_name)) + "." + output_format
 
@@ -88,7 +88,7 @@ def export_ethogram(self) -> None:
         if cfg.CANCEL in r:
             return
         pj = dict(cfg.EMPTY_PROJECT)
-        pj[cfg.ETHOGRAM] = dict(r)
+        pj[cfg.ETHOGRAM] = r
         # behavioral categories
 
         pj[cfg.BEHAVIORAL_CATEGORIES] = list(self.pj[cfg.BEHAVIORAL_CATEGORIES])
@@ -125,22 +125,26 @@ def export_ethogram(self) -> None:
             "Modifiers (JSON)",
         ]
 
+        columns = tuple(
+            cfg.behavioursFields[field] for field in ("code", cfg.TYPE, "description", "key", cfg.COLOR, "category", "excluded")
+        )
+        modifiers_col = cfg.behavioursFields[cfg.MODIFIERS]
+        item = self.twBehaviors.item
+
         for r in range(self.twBehaviors.rowCount()):
-            row: list = []
-            for field in ("code", cfg.TYPE, "description", "key", cfg.COLOR, "category", "excluded"):
-                row.append(self.twBehaviors.item(r, cfg.behavioursFields[field]).text())
+            row: list = [item(r, col).text() for col in columns]
 
             # modifiers
-            if self.twBehaviors.item(r, cfg.behavioursFields[cfg.MODIFIERS]).text():
+            if item(r, modifiers_col).text():
                 # modifiers a string
-                modifiers_dict = eval(self.twBehaviors.item(r, cfg.behavioursFields[cfg.MODIFIERS]).text())
+                modifiers_dict = self.parse_modifiers(item(r, modifiers_col).text())
                 modifiers_list = []
                 for key in modifiers_dict:
                     values = ",".join(modifiers_dict[key]["values"])
                     modifiers_list.append(f"{modifiers_dict[key]['name']}:{values}")
                 row.append(";".join(modifiers_list))
                 # modifiers as JSON
-                row.append(self.twBehaviors.item(r, cfg.behavioursFields[cfg.MODIFIERS]).text())
+                row.append(item(r, modifiers_col).text())
             else:
                 # modifiers a string
                 row.append("")
@@ -158,23 +162,23 @@ def export_subjects(self) -> None:
     """
     export the subjetcs list in various format
     """
-    extended_file_formats: list = [
-        cfg.TSV,
-        cfg.CSV,
-        cfg.ODS,
-        cfg.XLSX,
-        cfg.XLS,
-        cfg.HTML,
-    ]
-    file_formats: list = [cfg.TSV_EXT, cfg.CSV_EXT, cfg.ODS_EXT, cfg.XLSX_EXT, cfg.XLS_EXT, cfg.HTML_EXT]
+    # file dialog filter: file extension
+    file_formats: dict = {
+        cfg.TSV: cfg.TSV_EXT,
+        cfg.CSV: cfg.CSV_EXT,
+        cfg.ODS: cfg.ODS_EXT,
+        cfg.XLSX: cfg.XLSX_EXT,
+        cfg.XLS: cfg.XLS_EXT,
+        cfg.HTML: cfg.HTML_EXT,
+    }
 
     filediag_func = QFileDialog().getSaveFileName
 
-    file_name, filter_ = filediag_func(self, "Export the subjects list", "", ";;".join(extended_file_formats))
+    file_name, filter_ = filediag_func(self, "Export the subjects list", "", ";;".join(file_formats))
     if not file_name:
         return
 
-    outputFormat = file_formats[extended_file_formats.index(filter_)]
+    outputFormat = file_formats[filter_]
     if pl.Path(file_name).suffix != "." + outputFormat:
         file_name = str(pl.Path(file_name)) + "." + outputFormat
 
@@ -362,7 +366,10 @@ def import_ethogram_from_dict(self, project: dict):
                             }
                     project[cfg.ETHOGRAM][i][field] = dict(modif_set_dict)
 
-                item.setText(str(project[cfg.ETHOGRAM][i][field]))
+                if field == cfg.MODIFIERS:
+                    item.setText(json.dumps(project[cfg.ETHOGRAM][i][field]) if project[cfg.ETHOGRAM][i][field] else "")
+                else:
+                    item.setText(str(project[cfg.ETHOGRAM][i][field]))
 
                 if field not in cfg.ETHOGRAM_EDITABLE_FIELDS:
                     item.setFlags(Qt.ItemIsEnabled)
@@ -54,9 +54,11 @@ def select_observations2(self, mode: str, windows_title: str = "") -> Tuple[str,
             indep_var_header.append(pj[cfg.INDEPENDENT_VARIABLES][idx]["label"])
             column_type.append(pj[cfg.INDEPENDENT_VARIABLES][idx]["type"])
 
-    state_events_list = [
-        pj[cfg.ETHOGRAM][x][cfg.BEHAVIOR_CODE] for x in pj[cfg.ETHOGRAM] if cfg.STATE in pj[cfg.ETHOGRAM][x][cfg.TYPE].upper()
-    ]
+    state_events_list = frozenset(
+        behavior[cfg.BEHAVIOR_CODE] for behavior in pj[cfg.ETHOGRAM].values() if cfg.STATE in behavior[cfg.TYPE].upper()
+    )
+    # behavior types used to check the state events of each observation
+    event_types = {behavior[cfg.TYPE] for behavior in pj[cfg.ETHOGRAM].values()}
 
     data: list = []
     not_paired: list = []
@@ -108,7 +110,9 @@ def select_observations2(self, mode: str, windows_title: str = "") -> Tuple[str,
                         indepvar.append("")
 
             # check unpaired events
-            ok, _ = project_functions.check_state_events_obs(obs, pj[cfg.ETHOGRAM], pj[cfg.OBSERVATIONS][obs], cfg.HHMMSS)
+            ok, _ = project_functions.check_state_events_obs(
+                obs, pj[cfg.ETHOGRAM], pj[cfg.OBSERVATIONS][obs], cfg.HHMMSS, state_behaviors=state_events_list, event_types=event_types
+            )
             if not ok:
                 not_paired.append(obs)
 
@@ -229,11 +233,11 @@ def select_observations(pj: dict, mode: str, windows_title: str = "") -> Tuple[s
             indep_var_header.append(pj[cfg.INDEPENDENT_VARIABLES][idx]["label"])
             column_type.append(pj[cfg.INDEPENDENT_VARIABLES][idx]["type"])
 
-    state_events_list = [
-        pj[cfg.ETHOGRAM][x][cfg.BEHAVIOR_CODE]
-        for x in pj[cfg.ETHOGRAM]
-        if cfg.STATE in pj[cfg.ETHOGRAM][x][cfg.TYPE].upper()
-    ]
+    state_events_list = frozenset(
+        behavior[cfg.BEHAVIOR_CODE] for behavior in pj[cfg.ETHOGRAM].values() if cfg.STATE in behavior[cfg.TYPE].upper()
+    )
+    # behavior types used to check the state events of each observation
+    event_types = {behavior[cfg.TYPE] for behavior in pj[cfg.ETHOGRAM].values()}
 
     data: list = []
     not_paired: list = []
@@ -286,7 +290,9 @@ def select_observations(pj: dict, mode: str, windows_title: str = "") -> Tuple[s
                     indepvar.append("")
 
         # check unpaired events
-        ok, _ = project_functions.check_state_events_obs(obs, pj[cfg.ETHOGRAM], pj[cfg.OBSERVATIONS][obs], cfg.HHMMSS)
+        ok, _ = project_functions.check_state_events_obs(
+            obs, pj[cfg.ETHOGRAM], pj[cfg.OBSERVATIONS][obs], cfg.HHMMSS, state_behaviors=state_events_list, event_types=event_types
+        )
         if not ok:
             not_paired.append(obs)
 
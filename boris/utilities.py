@@ -1056,6 +1056,29 @@ def seconds2time(sec: dec) -> str:
     return f"{neg_sign}{hours:02}:{minutes:02}:{ssecs}"
 
 
+def seconds2srt_time(sec: float) -> str:
+    """
+    convert seconds to the hh:mm:ss,sss format used by SRT subtitles
+
+    Args:
+        sec (float): time in seconds
+    Returns:
+        str: time in format hh:mm:ss,sss
+    """
+
+    if math.isnan(sec) or sec > cfg.DATE_CUTOFF:
+        return seconds2time(sec).replace(".", ",")
+
+    neg_sign = "-" * (sec < 0)
+    abs_sec = abs(sec)
+
+    # same rounding as seconds2time: the remaining seconds are formatted with 3 decimals
+    hours, minutes = divmod(int(abs_sec / 60), 60)
+    ssecs = f"{abs_sec - hours * 3600 - minutes * 60:06.3f}"
+
+    return f"{neg_sign}{hours:02}:{minutes:02}:{ssecs[:-4]},{ssecs[-3:]}"
+
+
 def safeFileName(s: str) -> str:
     """
     replace characters not allowed in file name by _
@@ -15,6 +15,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from boris import project_functions
 from boris import config
+from boris import utilities
 
 @pytest.fixture()
 def before():
@@ -59,6 +60,46 @@ class Test_check_if_media_available(object):
     '''
 
 
+class Test_check_observation_exhaustivity(object):
+
+    def test_overlapping_intervals(self):
+        events = [[Decimal("0"), "", "s", "", ""],
+                  [Decimal("5"), "", "t", "", ""],
+                  [Decimal("10"), "", "s", "", ""],
+                  [Decimal("15"), "", "t", "", ""],
+                  [Decimal("20"), "", "p", "", ""]]
+        assert project_functions.check_observation_exhaustivity(events, ["s", "t"]) == Decimal("75.0")
+
+    def test_touching_intervals(self):
+        events = [[Decimal("0"), "", "s", "", ""],
+                  [Decimal("10"), "", "s", "", ""],
+                  [Decimal("10"), "", "t", "", ""],
+                  [Decimal("20"), "", "t", "", ""]]
+        assert project_functions.check_observation_exhaustivity(events, ["s", "t"]) == Decimal("100.0")
+
+    def test_nested_intervals(self):
+        events = [[Decimal("0"), "", "s", "", ""],
+                  [Decimal("5"), "", "t", "", ""],
+                  [Decimal("10"), "", "t", "", ""],
+                  [Decimal("20"), "", "s", "", ""],
+                  [Decimal("40"), "", "p", "", ""]]
+        assert project_functions.check_observation_exhaustivity(events, ["s", "t"]) == Decimal("50.0")
+
+    def test_two_subjects(self):
+        events = [[Decimal("0"), "a", "s", "", ""],
+                  [Decimal("0"), "b", "s", "", ""],
+                  [Decimal("5"), "b", "s", "", ""],
+                  [Decimal("10"), "a", "s", "", ""]]
+        assert project_functions.check_observation_exhaustivity(events, ["s"]) == Decimal("75.0")
+
+    def test_no_state_events(self):
+        events = [[Decimal("0"), "", "p", "", ""],
+                  [Decimal("10"), "", "p", "", ""]]
+        assert project_functions.check_observation_exhaustivity(events, ["s", "t"]) == 0
+
+    def test_no_events(self):
+        assert project_functions.check_observation_exhaustivity([], ["s"]) == 0
+
 
 class Test_check_project_integrity(object):
 
@@ -117,6 +158,62 @@ class Test_check_state_events_obs(object):
 
         assert results == (False, 'The behavior <b>s</b>  is not PAIRED for subject "<b>No focal subject</b>" at <b>00:00:26.862</b><br>')
 
+    def test_precomputed_arguments(self):
+        """
+        the state behaviors and the event types computed once give the same results
+        """
+        pj = json.loads(open("files/test.boris").read())
+        state_behaviors = frozenset(utilities.state_behavior_codes(pj[config.ETHOGRAM]))
+        event_types = {pj[config.ETHOGRAM][idx]["type"] for idx in pj[config.ETHOGRAM]}
+
+        for obs_id in pj[config.OBSERVATIONS]:
+            results = project_functions.check_state_events_obs(obs_id,
+                                                                pj[config.ETHOGRAM],
+                                                                pj[config.OBSERVATIONS][obs_id],
+                                                                config.HHMMSS)
+            results_precomputed = project_functions.check_state_events_obs(obs_id,
+                                                                            pj[config.ETHOGRAM],
+                                                                            pj[config.OBSERVATIONS][obs_id],
+                                                                            config.HHMMSS,
+                                                                            state_behaviors=state_behaviors,
+                                                                            event_types=event_types)
+
+            assert results == results_precomputed
+
+
+class Test_create_subtitles(object):
+
+    def create(self, parameters: dict, export_dir: str) -> str:
+        """
+        create the subtitles of the live export behavioral sequences observation and return the content
+        """
+        _, _, pj, _ = project_functions.open_project_json("files/test.boris")
+        parameters[config.SELECTED_SUBJECTS] = [config.NO_FOCAL_SUBJECT, "subject1", "subject2"]
+        parameters[config.SELECTED_BEHAVIORS] = [pj[config.ETHOGRAM][idx][config.BEHAVIOR_CODE] for idx in pj[config.ETHOGRAM]]
+        os.mkdir(export_dir)
+
+        result = project_functions.create_subtitles(pj, ["live export behavioral sequences"], parameters, export_dir)
+
+        assert result == (True, "")
+        return open(f"{export_dir}/live export behavioral sequences.srt").read()
+
+    @pytest.mark.usefixtures("before")
+    def test_full_observation(self):
+        for modifiers in ("with", "without"):
+            content = self.create({"time": config.TIME_FULL_OBS, "include modifiers": modifiers == "with"},
+                                  f"output/subtitles_full_obs_{modifiers}_modifiers")
+            assert content == open(f"files/create_subtitles_full_obs_{modifiers}_modifiers.srt").read()
+
+    @pytest.mark.usefixtures("before")
+    def test_time_interval(self):
+        for modifiers in ("with", "without"):
+            content = self.create({"time": config.TIME_ARBITRARY_INTERVAL,
+                                   config.START_TIME: 5,
+                                   config.END_TIME: 60,
+                                   "include modifiers": modifiers == "with"},
+                                  f"output/subtitles_time_interval_{modifiers}_modifiers")
+            assert content == open(f"files/create_subtitles_time_interval_{modifiers}_modifiers.srt").read()
+
 
 class Test_export_observations_list(object):
 
@@ -134,6 +231,62 @@ class Test_export_observations_list(object):
         assert open("files/export_observations_list_test1.tsv").read() == open("output/export_observations_list_test1.tsv").read()
 
 
+class Test_fix_unpaired_state_events(object):
+
+    def test_state_event_with_modifiers(self):
+        pj = json.loads(open("files/test.boris").read())
+        events = [[Decimal("1"), "", "r", "m1", "", "NA"],
+                  [Decimal("2"), "", "r", "m2", "", "NA"],
+                  [Decimal("3"), "", "r", "m2", "", "NA"],
+                  [Decimal("4"), "", "p", "", "", "NA"]]
+
+        results = project_functions.fix_unpaired_state_events(pj[config.ETHOGRAM], {config.EVENTS: events}, Decimal("10"))
+
+        assert results == [[Decimal("10.001"), "", "r", "m1", "Event automatically added by the fix unpaired state events function", "NA"]]
+
+    def test_state_reopened(self):
+        pj = json.loads(open("files/test.boris").read())
+        events = [[Decimal("1"), "", "s", "", "", "NA"],
+                  [Decimal("2"), "", "s", "", "", "NA"],
+                  [Decimal("5"), "", "s", "", "", "NA"]]
+
+        results = project_functions.fix_unpaired_state_events(pj[config.ETHOGRAM], {config.EVENTS: events}, Decimal("10"))
+
+        assert results == [[Decimal("10.001"), "", "s", "", "Event automatically added by the fix unpaired state events function", "NA"]]
+
+    def test_multi_subjects(self):
+        pj = json.loads(open("files/test.boris").read())
+        events = [[Decimal("1"), "subject2", "s", "", "", "NA"],
+                  [Decimal("2"), "subject1", "s", "", "", "NA"],
+                  [Decimal("3"), "subject1", "s", "", "", "NA"],
+                  [Decimal("4"), "", "m", "m1|n1", "", "NA"],
+                  [Decimal("5"), "subject1", "r", "m3", "", "NA"],
+                  [Decimal("6"), "subject1", "r", "m1", "", "NA"]]
+        comment = "Event automatically added by the fix unpaired state events function"
+
+        results = project_functions.fix_unpaired_state_events(pj[config.ETHOGRAM], {config.EVENTS: events}, Decimal("10"))
+
+        assert results == [[Decimal("10.001"), "", "m", "m1|n1", comment, "NA"],
+                           [Decimal("10.002"), "subject1", "r", "m3", comment, "NA"],
+                           [Decimal("10.003"), "subject1", "r", "m1", comment, "NA"],
+                           [Decimal("10.004"), "subject2", "s", "", comment, "NA"]]
+
+        results = project_functions.fix_unpaired_state_events2(pj[config.ETHOGRAM], events, Decimal("10"))
+
+        assert results == [[Decimal("10"), "", "m", "m1|n1", comment, "NA"],
+                           [Decimal("10"), "subject1", "r", "m3", comment, "NA"],
+                           [Decimal("10"), "subject1", "r", "m1", comment, "NA"],
+                           [Decimal("10"), "subject2", "s", "", comment, "NA"]]
+
+    def test_paired(self):
+        pj = json.loads(open("files/test.boris").read())
+        events = [[Decimal("1"), "", "s", "", "", "NA"],
+                  [Decimal("2"), "", "s", "", "", "NA"]]
+
+        assert project_functions.fix_unpaired_state_events(pj[config.ETHOGRAM], {config.EVENTS: events}, Decimal("10")) == []
+        assert project_functions.fix_unpaired_state_events2(pj[config.ETHOGRAM], events, Decimal("10")) == []
+
+
 class Test_media_full_path(object):
 
     def test_file_and_dir(self):
@@ -161,6 +314,30 @@ class Test_remove_media_files_path(object):
         assert pj_wo_media_files_paths == json.loads(open("files/test_without_media_files_paths.boris").read())
 
 
+class Test_unpaired_state_events(object):
+
+    def test_state_reopened(self):
+        pj = json.loads(open("files/test.boris").read())
+        events = [[Decimal("1"), "", "s", "", "", "NA"],
+                  [Decimal("2"), "", "s", "", "", "NA"],
+                  [Decimal("5"), "", "s", "", "", "NA"]]
+
+        assert project_functions.unpaired_state_events(pj[config.ETHOGRAM], events) == [("", "s", "")]
+
+    def test_multi_subjects_with_modifiers(self):
+        pj = json.loads(open("files/test.boris").read())
+        events = [[Decimal("1"), "subject2", "s", "", "", "NA"],
+                  [Decimal("2"), "subject1", "r", "m3", "", "NA"],
+                  [Decimal("3"), "subject1", "r", "m1", "", "NA"],
+                  [Decimal("4"), "subject1", "r", "m3", "", "NA"],
+                  [Decimal("5"), "subject1", "r", "m3", "", "NA"],
+                  [Decimal("6"), "", "q", "m1", "", "NA"]]
+
+        assert project_functions.unpaired_state_events(pj[config.ETHOGRAM], events) == [("subject1", "r", "m1"),
+                                                                                          ("subject1", "r", "m3"),
+                                                                                          ("subject2", "s", "")]
+
+
 
 
 
@@ -470,6 +470,29 @@ class Test_seconds2time(object):
         assert utilities.seconds2time(Decimal(10.0)) == "00:00:10.000"
 
 
+class Test_seconds2srt_time(object):
+    def test_10(self):
+        assert utilities.seconds2srt_time(10.0) == "00:00:10,000"
+
+    def test_hours(self):
+        assert utilities.seconds2srt_time(3723.456) == "01:02:03,456"
+
+    def test_negative(self):
+        assert utilities.seconds2srt_time(-2.123) == "-00:00:02,123"
+
+    def test_half_millisecond(self):
+        # same rounding as seconds2time
+        for sec in (0.0005, 0.0015, 1.0005, 62.0625, 3600.0005):
+            assert utilities.seconds2srt_time(sec) == utilities.seconds2time(sec).replace(".", ",")
+
+    def test_nan(self):
+        assert utilities.seconds2srt_time(float("nan")) == "NA"
+
+    def test_epoch_date(self):
+        t = datetime.datetime.fromtimestamp(1700000000.123)
+        assert utilities.seconds2srt_time(1700000000.123) == f"{t:%Y-%m-%d %H:%M:%S},123"
+
+
 class Test_sorted_keys(object):
     def test_numeric_keys(self):
         r = utilities.sorted_keys({5: "a", 4: "7", 0: "z", 6: "a"})